@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Depends
+from pymongo.errors import PyMongoError
 
 from src.services.service_factory import (
     Authenticator,
@@ -41,6 +42,8 @@ async def delete_thread(
         HTTPException (422):
             - If `thread_id` is missing or empty.
             - If the vault URL header is missing or empty.
+        HTTPException (404):
+            - If the thread does not exist.
         HTTPException (500):
             - If deletion fails due to an internal storage error.
     """
@@ -61,13 +64,19 @@ async def delete_thread(
     Storage = await get_thread_storage(vault_url=auth.vault_url)
 
     try:
-        await Storage.delete_thread(thread_id)
+        deleted = await Storage.delete_thread(thread_id)
         logger.info(
             "Deleted thread from storage",
-            extra={"thread_id": thread_id, "user_id": auth.username},
+            extra={
+                "thread_id": thread_id,
+                "user_id": auth.username,
+                "deleted": deleted,
+            },
         )
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Thread not found.")
         return {"Successfully removed thread from storage."}
-    except Exception as e:
+    except PyMongoError as e:
         logger.warning(
             "Failed to delete thread from storage",
             extra={"thread_id": thread_id, "user_id": auth.username, "error": str(e)},
@@ -45,7 +45,7 @@ async def get_user_threads(
                    - thread_id (str)
                    - date (datetime | str)
                    - topic (str)
-                   - content (Any)
+                   - content (list, always empty; use /getthread)
                 2. The total number of threads available for the user
                    (int), independent of the requested limit.
 
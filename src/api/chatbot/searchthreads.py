@@ -48,7 +48,7 @@ async def search_threads(
                    - thread_id (str)
                    - date (datetime | str)
                    - topic (str)
-                   - content (Any)
+                   - content (list, always empty; use /getthread)
                 2. The total number of matching threads (int).
 
     Raises:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Depends
+from pymongo.errors import PyMongoError
 
 from src.services.service_factory import (
     Authenticator,
@@ -47,6 +48,8 @@ async def set_thread_topic(
             - If the vault URL header is missing or empty.
         HTTPException (503):
             - If the storage backend (e.g., MongoDB) connection fails.
+        HTTPException (404):
+            - If the thread does not exist.
         HTTPException (500):
             - If updating the thread topic fails due to an internal error.
     """
@@ -72,13 +75,19 @@ async def set_thread_topic(
         raise HTTPException(status_code=503, detail="Failed to connect to MongoDB.")
 
     try:
-        await Storage.update_thread_topic(thread_id, topic)
+        updated = await Storage.update_thread_topic(thread_id, topic)
         logger.info(
             "Updated thread topic",
-            extra={"thread_id": thread_id, "user_id": auth.username},
+            extra={
+                "thread_id": thread_id,
+                "user_id": auth.username,
+                "updated": updated,
+            },
         )
+        if not updated:
+            raise HTTPException(status_code=404, detail="Thread not found.")
         return {"Successfully updated thread topic."}
-    except Exception as e:
+    except PyMongoError as e:
         logger.warning(
             "Failed to update thread topic",
             extra={"thread_id": thread_id, "user_id": auth.username, "error": str(e)},
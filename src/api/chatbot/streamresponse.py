@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import time
-from typing import Optional, Generator
+from typing import Optional
 
+import orjson
 from fastapi import APIRouter, Query, HTTPException, Depends
 from starlette.responses import StreamingResponse
 
@@ -41,19 +41,24 @@ router = APIRouter()
 CHECK_INTERVAL = 3  # seconds, the interval to wait before check STOP request
 
 
-def _sse_data(obj: SVDict) -> Generator[bytes]:
+def _sse_data(obj: SVDict) -> bytes:
+    """
+    Encode one variant as NDJSON. Images are split into several lines, which
+    are still returned as one payload so they go out in a single send.
+    """
     if obj.get("variant") == IMAGE:
         image_b64 = obj.get("content")
         id = obj.get("id")
         CHUNK_SIZE = 16_384  # 16 KiB per JSON line
 
         # The fact that image_b64 will always be a string is implied by requiring the input to be a SVDict, which is only constructed from StreamVariants, which have strict types.
-        for frag in chunks(image_b64, CHUNK_SIZE):
-            payload = json.dumps({"variant": "Image", "content": frag, "id": id})
-            yield f"{payload}\n".encode("utf-8")
-    else:
-        payload = json.dumps(obj)
-        yield f"{payload}\n".encode("utf-8")
+        return b"".join(
+            orjson.dumps({"variant": "Image", "content": frag, "id": id}) + b"\n"
+            for frag in chunks(image_b64, CHUNK_SIZE)
+        )
+    # orjson encodes straight to UTF-8 bytes, no str round-trip. ServerHint
+    # data is free-form, so allow non-str keys as json.dumps did.
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) + b"\n"
 
 
 @router.get("/streamresponse", dependencies=[AuthRequired])
@@ -217,8 +222,7 @@ async def streamresponse(
             system_prompt=system_prompt,
             logger=logger,
         ):
-            for data in _sse_data(from_sv_to_json(variant)):
-                yield data
+            yield _sse_data(from_sv_to_json(variant))
 
             now = time.monotonic()
             # Check if there is STOP request from
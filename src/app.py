@@ -11,6 +11,8 @@ from src.core.settings import get_settings
 from src.core.logging_setup import configure_logging
 from src.core.runtime_checks import run_startup_checks
 from src.services.streaming.active_conversations import cleanup_idle
+from src.services.storage.helpers import close_clients
+from src.services.streaming.litellm_client import close_client as close_llm_client
 
 settings = get_settings()
 logger = configure_logging(__name__)
@@ -48,6 +50,8 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown (was @app.on_event("shutdown"))
         app.state.periodic_cleanup.cancel()
+        await close_clients()
+        await close_llm_client()
 
 
 app = FastAPI(
@@ -53,6 +53,18 @@ class ThreadFilter(ContextFilter):
         return thread_id == self.expected
 
 
+class ContextAdapter(logging.LoggerAdapter):
+    """
+    LoggerAdapter that merges a per-call `extra` into the bound context.
+    (The stdlib adapter silently replaces it, dropping e.g. thread_id.)
+    """
+
+    def process(self, msg, kwargs):
+        extra = kwargs.get("extra")
+        kwargs["extra"] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+
 def _ensure_base_logging() -> None:
     global _CONFIGURED
     if _CONFIGURED:
@@ -90,7 +102,6 @@ def _get_thread_handler(thread_id: str) -> RotatingFileHandler:
     if thread_id in _THREAD_HANDLERS:
         return _THREAD_HANDLERS[thread_id]
 
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
     handler = RotatingFileHandler(
         LOG_DIR / f"{thread_id}.log",
         maxBytes=THREAD_MAX_BYTES,
@@ -108,7 +119,6 @@ def _get_named_handler(log_name: str) -> RotatingFileHandler:
     if log_name in _NAMED_HANDLERS:
         return _NAMED_HANDLERS[log_name]
 
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
     handler = RotatingFileHandler(
         LOG_DIR / f"{log_name}.log",
         maxBytes=THREAD_MAX_BYTES,
@@ -127,7 +137,7 @@ def configure_logging(
     thread_id: Optional[str] = None,
     user_id: Optional[str] = None,
     named_log: Optional[str] = None,
-) -> logging.LoggerAdapter:
+) -> ContextAdapter:
     """
     Configure root logging once and return a logger adapter with optional context.
     When thread_id is provided, logs are also written to logs/log_<thread_id>.txt.
@@ -149,7 +159,7 @@ def configure_logging(
     logging.getLogger("docket").setLevel(logging.WARNING)
     logging.getLogger("pymongo").setLevel(logging.WARNING)
 
-    return logging.LoggerAdapter(
+    return ContextAdapter(
         logger, {"thread_id": thread_id or "-", "user_id": user_id or "-"}
     )
 
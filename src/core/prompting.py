@@ -144,16 +144,27 @@ def _load_examples_as_messages(examples_path: str | Path) -> list[dict]:
     # This means that the above error message can be ignored.
 
 
-def get_entire_prompt(user_id: str, thread_id: str, model: str) -> List[Dict[str, Any]]:
+@lru_cache(maxsize=256)
+def _static_prompt(model: str) -> tuple[Dict[str, Any], ...]:
     """
-    Build the full, ordered message list for a completion request (non-streaming).
-    Order: [ System(starting), *examples, System(summary) ]
+    The prompt depends only on the model's prompt set, so it is assembled
+    (and examples.jsonl parsed) once per model.
     """
     assets = _load_prompts(model)
     messages: List[Dict[str, Any]] = []
     messages.append(_as_system_message(assets["starting"]))
     messages.extend(_load_examples_as_messages(assets["examples_path"]))
     messages.append(_as_system_message(assets["summary"]))
+    return tuple(messages)
+
+
+def get_entire_prompt(user_id: str, thread_id: str, model: str) -> List[Dict[str, Any]]:
+    """
+    Build the full, ordered message list for a completion request (non-streaming).
+    Order: [ System(starting), *examples, System(summary) ]
+    """
+    # Callers extend the list with the conversation, so hand out fresh copies.
+    messages: List[Dict[str, Any]] = [dict(m) for m in _static_prompt(model)]
 
     # Optional: mark placeholder when model is GPT-5 (useful for debugging)
     if model_is_gpt_5(model):
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 import uuid
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, List, Tuple
 import threading
 
 import httpx
+import orjson
 
 from src.core.logging_setup import configure_logging
 from src.core.settings import get_settings
@@ -150,11 +150,11 @@ class McpClient:
                         break
 
                 if data_lines:
-                    payload = json.loads("\n".join(data_lines))
+                    payload = orjson.loads("\n".join(data_lines))
 
             elif response.content:
                 try:
-                    payload = response.json()
+                    payload = orjson.loads(response.content)
                 except Exception:
                     # fallback for non-JSON bodies (auth errors etc.)
                     payload = response.text
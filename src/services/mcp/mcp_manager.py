@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import threading
 from typing import Optional, Dict, Any, List, Literal
 
@@ -49,6 +50,8 @@ class McpManager:
             t: [] for t in self._servers
         }
         self._openai_tools_cache: Optional[List[Dict[str, Any]]] = None
+        # tool name -> first server offering it; rebuilt lazily after discovery
+        self._server_by_tool: Optional[Dict[str, Target]] = None
 
     # ────────── lifecycle ──────────
 
@@ -152,27 +155,46 @@ class McpManager:
 
         with self._lock:
             self._tools_by_target[target] = normalized
-            # invalidate merged cache
+            # invalidate merged caches
             self._openai_tools_cache = None
+            self._server_by_tool = None
 
     def get_server_from_tool(self, tool_name: str) -> Optional[Target]:
         """
         Given a tool name, return which server it belongs to,
         or None if not found.
         """
+        by_tool = self._server_by_tool
+        if by_tool is None:
+            with self._lock:
+                by_tool = {}
+                for tgt in self._servers:
+                    for t in self._tools_by_target[tgt]:
+                        # first server wins, as in a linear search
+                        by_tool.setdefault(t.get("name"), tgt)
+                self._server_by_tool = by_tool
+        return by_tool.get(tool_name)
+
+    def headers_identity(self, target: Target | str) -> str:
+        """
+        Digest of the headers sent to `target` (per-user mongodb-uri, vault and
+        Authorization). Results cached across managers must be keyed by it.
+        """
         with self._lock:
-            for tgt in self._servers:
-                for t in self._tools_by_target[tgt]:
-                    if t.get("name") == tool_name:
-                        return tgt
-        return None
+            headers = sorted((self._default_headers.get(target) or {}).items())
+        return hashlib.blake2b(repr(headers).encode(), digest_size=16).hexdigest()
 
     # ────────── tool export to LLM ──────────
 
     def openai_tools(self) -> List[Dict[str, Any]]:
         """
         Return cached OpenAI-style tool schemas. Empty list if discovery failed.
+        The cached list itself is returned (it is sent to the LLM on every
+        turn); callers must not mutate it.
         """
+        tools = self._openai_tools_cache
+        if tools is not None:
+            return tools
         with self._lock:
             if self._openai_tools_cache is None:
                 # rebuild merged cache on-demand
@@ -181,7 +203,7 @@ class McpManager:
                     for t in self._tools_by_target[tgt]:
                         merged.append(mcp_tool_to_openai_function(t))
                 self._openai_tools_cache = merged
-            return list(self._openai_tools_cache)
+            return self._openai_tools_cache
 
     # ────────── calling tools ──────────
 
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from typing import Optional, Dict
 from fastapi import Depends, Request
@@ -82,7 +83,8 @@ async def get_mcp_manager(
     extra_headers = await get_mcp_headers(authenticator, cache, logger=logger)
 
     try:
-        mgr.initialize(extra_headers)
+        # Connecting and discovering tools is blocking network I/O.
+        await asyncio.to_thread(mgr.initialize, extra_headers)
         logger.info("Successfully initialized the MCPManager!")
         return mgr
     except Exception as e:
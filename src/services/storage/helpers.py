@@ -1,6 +1,8 @@
-from typing import Dict, List, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass
+import asyncio
+import time
+from dataclasses import dataclass, field
 
 import httpx
 from fastapi import HTTPException
@@ -23,6 +25,28 @@ MONGODB_COLLECTION_NAME = settings.MONGODB_COLLECTION_NAME
 DEFAULT_LOGGER = configure_logging(__name__)
 
 CACHE_ROOT = Path("./cache")
+# Cache dirs known to exist, so repeat requests for a thread skip the mkdir.
+_CREATED_CACHE_DIRS: set[Path] = set()
+
+# Vault lookups: resolved URIs are reused for a while, and a lock per vault URL
+# keeps concurrent callers from all hitting the vault when the entry is stale,
+# without a slow vault holding up lookups for the others.
+_URI_TTL_S = 300.0
+_URI_CACHE: Dict[str, Tuple[float, str]] = {}
+_URI_LOCKS: Dict[str, asyncio.Lock] = {}
+_VAULT_CLIENT: Optional[httpx.AsyncClient] = None
+
+# One client (and thus one connection pool) per MongoDB URI, shared process-wide.
+_CLIENT_CACHE: Dict[str, AsyncMongoClient] = {}
+_CLIENT_OPTIONS = dict(
+    appname="freva-gpt",
+    # Thread contents are large; compress on the wire with the cheap codecs
+    # (their modules come with the pymongo[snappy,zstd] extras).
+    compressors="zstd,snappy",
+    maxPoolSize=200,
+    minPoolSize=20,
+    connectTimeoutMS=30000,
+)
 
 # ──────────────────────────── Model ───────────────────────────────────
 
@@ -33,7 +57,8 @@ class Thread:
     thread_id: str
     date: str  # ISO 8601
     topic: str
-    content: List[StreamVariant]
+    # Left empty by listings/searches, which only fetch metadata.
+    content: List[StreamVariant] = field(default_factory=list)
 
 
 # ──────────────────── Helper Functions ──────────────────────────────
@@ -45,8 +70,11 @@ def create_dir_at_cache(user_id: str, thread_id: str) -> None:
     retry with a sanitized user_id (keep only [A-Za-z0-9]). Logs but never raises.
     """
     cache = CACHE_ROOT / thread_id
+    if cache in _CREATED_CACHE_DIRS:
+        return
     try:
         cache.mkdir(parents=True, exist_ok=True)
+        _CREATED_CACHE_DIRS.add(cache)
         DEFAULT_LOGGER.debug("cache created or exists: %s", cache)
         return
     except Exception as e:
@@ -71,13 +99,19 @@ def _fallback_topic(raw: str | None) -> str:
 async def summarize_topic(content: List[StreamVariant]) -> str:
     """
     Try LiteLLM; on any failure, return a safe fallback so requests don't crash.
-    Only the first user text is taken into account.
+    Only the first user text is taken into account; short texts are used as is.
     """
-    topic = next((sv.text for sv in content if isinstance(sv, SVUser)), "Untitled")
+    topic = next((sv.text for sv in content if isinstance(sv, SVUser)), None)
+    if not topic or topic.isspace():
+        return "Untitled"
+    # Short enough to be a title already (the LLM is asked for at most ~12
+    # words, and the fallback keeps up to 80 chars): skip the LLM round-trip.
+    if len(topic) <= 80 and len(topic.split()) <= 12:
+        return _fallback_topic(topic)
 
     prompt = (
         "Summarize this chat topic in at most ~12 words, neutral tone.\n\n"
-        f"Topic:\n{(topic or '')[:2000]}"
+        f"Topic:\n{topic[:2000]}"
     )
     try:
         resp = await acomplete(
@@ -96,11 +130,39 @@ async def summarize_topic(content: List[StreamVariant]) -> str:
 # ──────────────────── Connection ──────────────────────────────
 
 
+def _cached_uri(vault_url: str) -> Optional[str]:
+    hit = _URI_CACHE.get(vault_url)
+    if hit and time.monotonic() - hit[0] < _URI_TTL_S:
+        return hit[1]
+    return None
+
+
+def _vault_client() -> httpx.AsyncClient:
+    global _VAULT_CLIENT
+    if _VAULT_CLIENT is None or _VAULT_CLIENT.is_closed:
+        _VAULT_CLIENT = httpx.AsyncClient(timeout=10)
+    return _VAULT_CLIENT
+
+
 async def get_mongodb_uri(vault_url: str) -> str:
+    """Resolve the MongoDB URI from the vault, cached for _URI_TTL_S seconds."""
+    uri = _cached_uri(vault_url)
+    if uri:
+        return uri
+    async with _URI_LOCKS.setdefault(vault_url, asyncio.Lock()):
+        # Another caller may have refreshed it while we waited.
+        uri = _cached_uri(vault_url)
+        if uri:
+            return uri
+        uri = await _fetch_mongodb_uri(vault_url)
+        _URI_CACHE[vault_url] = (time.monotonic(), uri)
+        return uri
+
+
+async def _fetch_mongodb_uri(vault_url: str) -> str:
     # 1) GET vault_url
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(vault_url)
+        r = await _vault_client().get(vault_url)
     except Exception:
         # 503 ServiceUnavailable
         raise HTTPException(status_code=503, detail="Error sending request to vault.")
@@ -127,12 +189,37 @@ async def get_mongodb_uri(vault_url: str) -> str:
     return uri.strip()
 
 
+def get_client(uri: str) -> AsyncMongoClient:
+    """
+    Return the process-wide client for `uri`, creating it on first use.
+    Each client owns a pool and monitor tasks, so they must not be made per request.
+    """
+    client = _CLIENT_CACHE.get(uri)
+    if client is None:
+        client = _CLIENT_CACHE.setdefault(uri, AsyncMongoClient(uri, **_CLIENT_OPTIONS))
+    return client
+
+
+async def close_clients() -> None:
+    """
+    Close the shared MongoDB clients and the vault HTTP client;
+    called once at application shutdown.
+    """
+    global _VAULT_CLIENT
+    clients = list(_CLIENT_CACHE.values())
+    _CLIENT_CACHE.clear()
+    for client in clients:
+        await client.close()
+    if _VAULT_CLIENT is not None:
+        await _VAULT_CLIENT.aclose()
+        _VAULT_CLIENT = None
+
+
 async def get_database(vault_url: str) -> AsyncDatabase:
     """
-    Parity with Rust: fetch URI from vault via auth.get_mongodb_uri, connect with Motor.
+    Parity with Rust: fetch URI from vault via get_mongodb_uri, connect with pymongo async.
     If connection fails, retry once without URI options (strip trailing ?query).
     """
     mongodb_uri = await get_mongodb_uri(vault_url)
 
-    client = AsyncMongoClient(mongodb_uri, connectTimeoutMS=30000)
-    return client[MONGODB_DATABASE_NAME]
+    return get_client(mongodb_uri)[MONGODB_DATABASE_NAME]
@@ -1,18 +1,21 @@
 from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
+import asyncio
 import re
+import time
 
 import pymongo
-from pymongo import AsyncMongoClient
+from pymongo import UpdateOne
 from pymongo.asynchronous.database import AsyncDatabase
 
-from .helpers import Thread, get_database, summarize_topic
+from .helpers import Thread, get_client, get_database, summarize_topic
 from src.core.settings import get_settings
 from src.services.streaming.stream_variants import (
     StreamVariant,
     cleanup_conversation,
     from_sv_to_json,
-    from_json_to_sv,
 )
 from src.core.logging_setup import configure_logging
 
@@ -25,6 +28,90 @@ MONGODB_DATABASE_NAME = settings.MONGODB_DATABASE_NAME
 MONGODB_COLLECTION_NAME = settings.MONGODB_COLLECTION_NAME
 
 
+@lru_cache(maxsize=1024)
+def _escape(s: str) -> str:
+    # Search-as-you-type sends the same prefixes over and over.
+    return re.escape(s)
+
+
+# Recent-thread listings per (vault URL, user), LRU-bounded and short-lived.
+# Maps to {(limit, page): (timestamp, threads, total)}. Saves drop the user's
+# entry; topic updates and deletes only know the thread, so they drop all.
+_LIST_TTL_S = 60.0
+_LIST_CACHE_MAX_USERS = 1024
+_LIST_CACHE: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+
+# Recently read thread contents per (vault URL, thread_id)
+# -> (timestamp, date, content), short-lived. Every save stamps a new date, which
+# read_thread uses to validate an entry. Threads with images are not kept: their
+# base64 payloads would pin far more memory than the entry count suggests.
+_THREAD_TTL_S = 300.0
+_THREAD_CACHE_MAX = 128
+_THREAD_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, datetime, List[Dict]]]" = (
+    OrderedDict()
+)
+
+# Databases (keyed by vault URL, or dev URI) whose indexes were already ensured.
+_INDEXED_DBS: set[str] = set()
+
+
+async def _ensure_indexes(coll) -> None:
+    await coll.create_index("thread_id", unique=True)
+    # Serves list_recent_threads as an index scan in date order, no in-memory sort.
+    await coll.create_index(
+        [("user_id", pymongo.ASCENDING), ("date", pymongo.DESCENDING)]
+    )
+    # Topic trigrams, narrowing substring searches before the regex check.
+    await coll.create_index(
+        [("user_id", pymongo.ASCENDING), ("topic_tg", pymongo.ASCENDING)]
+    )
+
+
+def _trigrams(s: str) -> List[str]:
+    s = s.lower()
+    return sorted({s[i : i + 3] for i in range(len(s) - 2)})
+
+
+def _topic_fields(topic: str) -> Dict:
+    """The topic together with the derived fields used by query_by_topic."""
+    return {"topic": topic, "topic_lc": topic.lower(), "topic_tg": _trigrams(topic)}
+
+
+def _serialize_sv_list(content: List[StreamVariant]) -> List[Dict]:
+    return [from_sv_to_json(v) for v in content]
+
+
+def _thread_update(
+    user_id: str,
+    thread_id: str,
+    topic: Optional[str],
+    content: List[StreamVariant],
+    append: bool,
+) -> Dict:
+    """
+    Update document for an upsert of one thread, keyed by its thread_id.
+    With topic=None the topic is left alone. A new thread gets an empty one, so
+    that a later save summarizes again if the topic is never written.
+    """
+    new_stream = _serialize_sv_list(content)
+    # The owner and id never change after the first write; keeping them out of
+    # $set avoids rewriting (and re-keying the indexes on) them on every save.
+    immutable = {"user_id": user_id, "thread_id": thread_id}
+    doc = {"date": datetime.now(timezone.utc)}
+    if topic is None:
+        immutable.update(_topic_fields(""))
+    else:
+        doc.update(_topic_fields(topic))
+    if append:
+        # Append server-side instead of reading and rewriting the history.
+        return {
+            "$set": doc,
+            "$setOnInsert": immutable,
+            "$push": {"content": {"$each": new_stream}},
+        }
+    return {"$set": {**doc, "content": new_stream}, "$setOnInsert": immutable}
+
+
 class ThreadStorage:
     """PROD / shared implementation: store threads in MongoDB."""
 
@@ -35,16 +122,17 @@ class ThreadStorage:
     @classmethod
     async def create(cls, vault_url: str):
         if settings.DEV:
-            db = AsyncMongoClient(settings.MONGODB_URI_DEV)[MONGODB_DATABASE_NAME]
+            db = get_client(settings.MONGODB_URI_DEV)[MONGODB_DATABASE_NAME]
         else:
             db = await get_database(vault_url)
         s = cls(vault_url=vault_url, db=db)
 
-        coll = db[MONGODB_COLLECTION_NAME]
-        await coll.create_index("thread_id", unique=True)
-        await coll.create_index(
-            [("user_id", pymongo.ASCENDING), ("date", pymongo.DESCENDING)]
-        )
+        # create() runs for every request; only talk to the server about
+        # indexes the first time a database is seen in this process.
+        db_key = settings.MONGODB_URI_DEV if settings.DEV else vault_url
+        if db_key not in _INDEXED_DBS:
+            await _ensure_indexes(db[MONGODB_COLLECTION_NAME])
+            _INDEXED_DBS.add(db_key)
 
         return s
 
@@ -55,44 +143,35 @@ class ThreadStorage:
         content: List[StreamVariant],
         append_to_existing: Optional[bool] = False,
     ) -> None:
-        logger = configure_logging(__name__, thread_id=thread_id, user_id=user_id)
         content: list[StreamVariant] = cleanup_conversation(content)
         if not content:
             return
 
         coll = self.db[MONGODB_COLLECTION_NAME]
 
-        existing = await coll.find_one({"thread_id": thread_id})
-        merged_sv: List[StreamVariant] = content
-        topic = None
-        if existing:
-            if append_to_existing:
-                existing_stream = existing.get("content", [])
-                existing_sv: list[StreamVariant] = [
-                    from_json_to_sv(v) for v in existing_stream
-                ]
-                merged_sv: List[StreamVariant] = existing_sv + content
-            # topic: keep existing if present
-            topic = existing.get("topic", "") or None
-
-        # compute topic if missing
-        if not topic:
-            topic = await summarize_topic(content)
-
-        all_stream = [from_sv_to_json(v) for v in merged_sv] if merged_sv else []
-        doc = {
-            "user_id": user_id,
-            "thread_id": thread_id,
-            "date": datetime.now(timezone.utc),
-            "topic": topic,
-            "content": all_stream,
-        }
+        # Only the topic is needed up front: keep it if present, else summarize.
+        existing = await coll.find_one({"thread_id": thread_id}, {"topic": 1, "_id": 0})
+        topic = (existing or {}).get("topic", "") or None
+        # Summarizing is an LLM call; let it run while the content is written
+        # and set the topic afterwards, instead of delaying the write.
+        topic_task = None if topic else asyncio.create_task(summarize_topic(content))
 
-        if existing:
-            await coll.update_one({"thread_id": thread_id}, {"$set": doc}, upsert=True)
-        else:
-            await coll.insert_one(doc)
-        logger.info(
+        update = _thread_update(
+            user_id, thread_id, topic, content, append=bool(append_to_existing)
+        )
+        try:
+            await coll.update_one({"thread_id": thread_id}, update, upsert=True)
+        except BaseException:
+            if topic_task is not None:
+                topic_task.cancel()
+            raise
+        if topic_task is not None:
+            topic = await topic_task
+            await coll.update_one(
+                {"thread_id": thread_id}, {"$set": _topic_fields(topic)}
+            )
+        _LIST_CACHE.pop((self.vault_url, user_id), None)
+        DEFAULT_LOGGER.info(
             "Saved thread to MongoDB",
             extra={
                 "thread_id": thread_id,
@@ -101,33 +180,75 @@ class ThreadStorage:
             },
         )
 
+    async def save_threads_bulk(
+        self,
+        threads: List[Tuple[str, str, List[StreamVariant]]],
+    ) -> None:
+        """
+        Save many (thread_id, user_id, content) threads, replacing their content,
+        in a single unordered bulk write instead of one round-trip per thread.
+        """
+        threads = [
+            (tid, uid, cleaned)
+            for tid, uid, content in threads
+            if (cleaned := cleanup_conversation(content))
+        ]
+        if not threads:
+            return
+
+        coll = self.db[MONGODB_COLLECTION_NAME]
+        cursor = coll.find(
+            {"thread_id": {"$in": [tid for tid, _, _ in threads]}},
+            {"thread_id": 1, "topic": 1, "_id": 0},
+        )
+        topics = {d["thread_id"]: d.get("topic") for d in await cursor.to_list(None)}
+        missing = [(tid, content) for tid, _, content in threads if not topics.get(tid)]
+        summaries = await asyncio.gather(*(summarize_topic(c) for _, c in missing))
+        topics.update((tid, topic) for (tid, _), topic in zip(missing, summaries))
+
+        ops = [
+            UpdateOne(
+                {"thread_id": tid},
+                _thread_update(uid, tid, topics[tid], content, append=False),
+                upsert=True,
+            )
+            for tid, uid, content in threads
+        ]
+        result = await coll.bulk_write(ops, ordered=False)
+        for _, uid, _ in threads:
+            _LIST_CACHE.pop((self.vault_url, uid), None)
+        DEFAULT_LOGGER.info(
+            "Bulk saved threads to MongoDB",
+            extra={
+                "threads": len(ops),
+                "upserted": result.upserted_count,
+                "modified": result.modified_count,
+            },
+        )
+
     async def list_recent_threads(
         self,
         user_id: str,
         limit: int = 20,
         page: int = 0,
     ) -> Tuple[List[Thread], int]:
-        logger = configure_logging(__name__, user_id=user_id)
-        coll = self.db[MONGODB_COLLECTION_NAME]
-        n_threads = await coll.count_documents({"user_id": user_id})
-        cursor = (
-            coll.find({"user_id": user_id})
-            .sort([("date", -1)])
-            .skip(page * limit)
-            .limit(limit)
+        key = (self.vault_url, user_id)
+        pages = _LIST_CACHE.get(key)
+        hit = pages.get((limit, page)) if pages else None
+        if hit and time.monotonic() - hit[0] < _LIST_TTL_S:
+            _LIST_CACHE.move_to_end(key)
+            return list(hit[1]), hit[2]
+
+        threads, n_threads = await self._find_page({"user_id": user_id}, limit, page)
+        _LIST_CACHE.setdefault(key, {})[(limit, page)] = (
+            time.monotonic(),
+            threads,
+            n_threads,
         )
-        docs = await cursor.to_list(length=limit)
-        threads = [
-            Thread(
-                user_id=d["user_id"],
-                thread_id=d["thread_id"],
-                date=d["date"],
-                topic=d.get("topic", ""),
-                content=d.get("content", []),
-            )
-            for d in docs
-        ]
-        logger.info(
+        _LIST_CACHE.move_to_end(key)
+        if len(_LIST_CACHE) > _LIST_CACHE_MAX_USERS:
+            _LIST_CACHE.popitem(last=False)
+        DEFAULT_LOGGER.info(
             "Listed recent threads from MongoDB",
             extra={"user_id": user_id, "returned": len(threads), "limit": limit},
         )
@@ -138,29 +259,64 @@ class ThreadStorage:
         thread_id: str,
     ) -> List[Dict]:
         # TODO check the return
-        logger = configure_logging(__name__, thread_id=thread_id)
         coll = self.db[MONGODB_COLLECTION_NAME]
-        doc = await coll.find_one({"thread_id": thread_id})
-        if not doc:
-            logger.warning(
+        key = (self.vault_url, thread_id)
+        cached = _THREAD_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] >= _THREAD_TTL_S:
+            del _THREAD_CACHE[key]
+            cached = None
+        # Only the stream (and its date) is needed; skip the metadata fields.
+        # If the cached copy is still current the server leaves out the content.
+        projection: Dict = {"date": 1, "content": 1, "_id": 0}
+        if cached:
+            projection["content"] = {
+                "$cond": [{"$eq": ["$date", cached[1]]}, "$$REMOVE", "$content"]
+            }
+        doc = await coll.find_one({"thread_id": thread_id}, projection)
+        if doc is None:
+            _THREAD_CACHE.pop(key, None)
+            DEFAULT_LOGGER.warning(
                 "Thread not found in MongoDB", extra={"thread_id": thread_id}
             )
             raise FileNotFoundError("Thread not found")
-        return doc.get("content", [])
+        if cached and "content" not in doc:
+            _THREAD_CACHE.move_to_end(key)
+            return list(cached[2])
+
+        content = doc.get("content", [])
+        has_images = any(v.get("variant") == "Image" for v in content)
+        if doc.get("date") is not None and not has_images:
+            _THREAD_CACHE[key] = (time.monotonic(), doc["date"], content)
+            _THREAD_CACHE.move_to_end(key)
+            if len(_THREAD_CACHE) > _THREAD_CACHE_MAX:
+                _THREAD_CACHE.popitem(last=False)
+        else:
+            _THREAD_CACHE.pop(key, None)
+        return list(content)
 
-    async def update_thread_topic(self, thread_id: str, topic: str):
-        logger = configure_logging(__name__, thread_id=thread_id)
+    async def update_thread_topic(self, thread_id: str, topic: str) -> bool:
+        """Set a new topic; returns False if the thread does not exist."""
         coll = self.db[MONGODB_COLLECTION_NAME]
-        update_op = {"$set": {"topic": topic}}
-        await coll.update_one({"thread_id": thread_id}, update_op)
-        logger.info("Updated topic in MongoDB", extra={"thread_id": thread_id})
+        update_op = {"$set": _topic_fields(topic)}
+        result = await coll.update_one({"thread_id": thread_id}, update_op)
+        _LIST_CACHE.clear()
+        if not result.matched_count:
+            DEFAULT_LOGGER.warning(
+                "Topic update matched no thread", extra={"thread_id": thread_id}
+            )
+            return False
+        DEFAULT_LOGGER.info("Updated topic in MongoDB", extra={"thread_id": thread_id})
+        return True
 
     async def delete_thread(
         self,
         thread_id: str,
-    ):
+    ) -> bool:
+        """Delete a thread; returns False if there was nothing to delete."""
         coll = self.db[MONGODB_COLLECTION_NAME]
-        await coll.delete_one({"thread_id": thread_id})
+        result = await coll.delete_one({"thread_id": thread_id})
+        _LIST_CACHE.clear()
+        return bool(result.deleted_count)
 
     async def query_by_topic(
         self,
@@ -170,30 +326,53 @@ class ThreadStorage:
         page: int,
     ) -> tuple[int, List[Thread]]:
         """
-        Search in the topic field.
+        Search in the topic field (case-insensitive substring match).
+        The indexed `topic_tg` trigrams select the candidates, and a regex on
+        `topic_lc` verifies them. Threads without `topic_tg` are matched on
+        `topic` directly.
         """
-        coll = self.db[MONGODB_COLLECTION_NAME]
-        filt = {
-            "user_id": user_id,
-            "topic": {"$regex": re.escape(topic), "$options": "i"},
+        indexed = {"topic_lc": {"$regex": _escape(topic.lower())}}
+        # Terms shorter than three characters have no trigrams to narrow by.
+        if trigrams := _trigrams(topic):
+            indexed["topic_tg"] = {"$all": trigrams}
+        # Threads saved before topic_lc/topic_tg existed, or by other
+        # writers, only have `topic`; match those with a plain regex.
+        legacy = {
+            "topic_tg": {"$exists": False},
+            "topic": {"$regex": _escape(topic), "$options": "i"},
         }
+        filt = {"user_id": user_id, "$or": [indexed, legacy]}
+        threads, total = await self._find_page(filt, num_threads, page)
+        return total, threads
 
-        total = await coll.count_documents(filt)
+    async def _find_page(
+        self,
+        filt: Dict,
+        limit: int,
+        page: int,
+    ) -> Tuple[List[Thread], int]:
+        """
+        Return one page of threads matching `filt` (newest first) together with
+        the total number of matches. The page query and the count run
+        concurrently; both can use the (user_id, date) index.
+        Only metadata is fetched; `content` stays empty (use read_thread).
+        """
+        coll = self.db[MONGODB_COLLECTION_NAME]
+        projection = {"user_id": 1, "thread_id": 1, "date": 1, "topic": 1, "_id": 0}
+        # limit=0 means "no limit", for find().limit(0) as for to_list(None)
         cursor = (
-            coll.find(filt)
-            .sort("updated_at", -1)
-            .skip(page * num_threads)
-            .limit(num_threads)
+            coll.find(filt, projection).sort("date", -1).skip(page * limit).limit(limit)
+        )
+        total, docs = await asyncio.gather(
+            coll.count_documents(filt), cursor.to_list(length=limit or None)
         )
-        docs = await cursor.to_list(length=num_threads)
         threads = [
             Thread(
                 user_id=d["user_id"],
                 thread_id=d["thread_id"],
                 date=d["date"],
                 topic=d.get("topic", ""),
-                content=d.get("content", []),
             )
             for d in docs
         ]
-        return total, threads
+        return threads, total
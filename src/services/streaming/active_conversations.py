@@ -1,11 +1,12 @@
-import string
-import random
+import secrets
 import json
+from collections import OrderedDict, deque
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
-from datetime import datetime, timezone, timedelta
+from typing import Deque, List, Optional
+from datetime import timedelta
 import asyncio
+import time
 
 from src.core.logging_setup import configure_logging
 from src.services.streaming.stream_variants import StreamVariant, SVCode
@@ -33,37 +34,41 @@ class ActiveConversation:
     state: ConversationState
     mcp_manager: Optional[McpManager]
     tool_tasks: set[asyncio.Task] = field(default_factory=set)
-    messages: List[StreamVariant] = field(default_factory=list)
-    last_activity: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-
-
-Registry: Dict[str, ActiveConversation] = {}
+    # Append-only; a deque grows without the reallocation copies of a list.
+    messages: Deque[StreamVariant] = field(default_factory=deque)
+    # time.monotonic() of the last use; only compared against idle limits.
+    last_activity: float = field(default_factory=time.monotonic)
+
+
+# Least recently used first. Bounded by MAX_ACTIVE so that a stalled
+# cleanup_idle cannot let it (and the McpManagers it holds) grow without limit.
+Registry: "OrderedDict[str, ActiveConversation]" = OrderedDict()
+MAX_ACTIVE = 1024
+# Guards mutations of the Registry and of its conversations. Read-only lookups
+# skip it: a single dict read does not await, so it is atomic on the event loop.
+# They may see a conversation while a locked update awaits (e.g. ENDED while it
+# is being saved), which is fine for their callers.
 RegistryLock = asyncio.Lock()
 
 
 def _generate_id(length: int = 32) -> str:
-    """Generate a random thread id candidate."""
-    return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+    """Generate a random thread id (hex, so still alphanumeric)."""
+    return secrets.token_hex(length // 2)
 
 
 async def new_thread_id() -> str:
     """
-    Create a new unique thread_id that does not collide with existing entries
-    in the in-memory registry.
+    Create a new unique thread_id. With 128 random bits a collision with an
+    existing thread is not a practical concern, so there is no retry loop.
     """
-    async with RegistryLock:
-        while True:
-            candidate = _generate_id()
-            if candidate not in Registry:
-                return candidate
+    return _generate_id()
 
 
 async def check_thread_exists(thread_id: str) -> bool:
     """
     Check if a thread_id exists in the registry.
     """
-    async with RegistryLock:
-        return thread_id in Registry.keys()
+    return thread_id in Registry
 
 
 async def initialize_conversation(
@@ -77,9 +82,11 @@ async def initialize_conversation(
     Initialize and register a new conversation in the registry with the given thread_id and user_id.
     If a conversation with the same thread_id already exists, it will be updated to STREAMING state
     and the last_activity timestamp will be refreshed, but the existing conversation will stay unchanged.
+    If the registry grows beyond MAX_ACTIVE, the least recently used conversation that has
+    ended (and so was already saved by its own request) is evicted.
     """
     log = logger or configure_logging(__name__, thread_id=thread_id, user_id=user_id)
-    now = datetime.now(timezone.utc)
+    now = time.monotonic()
     # if auth:
     mcp_mgr = await get_mcp_manager(authenticator=auth, thread_id=thread_id)
     # else:
@@ -92,7 +99,7 @@ async def initialize_conversation(
         user_id=user_id,
         state=ConversationState.STREAMING,
         mcp_manager=mcp_mgr,
-        messages=messages,
+        messages=deque(messages),
         last_activity=now,
     )
 
@@ -112,16 +119,24 @@ async def initialize_conversation(
             log.debug("Conversation was found in the Registry. Starting streaming...")
 
             conv.state = ConversationState.STREAMING
-            conv.last_activity = datetime.now(timezone.utc)
+            conv.last_activity = time.monotonic()
+            Registry.move_to_end(thread_id)
             return  # Don't continue with initialization if conversation already exists; we just update the state and timestamp.
 
         # In order to not have any race conditions, we keep the lock until we've written to the registry
 
         # register conversation
         Registry[thread_id] = maybe_new_conv
+        evicted = _pop_least_recent() if len(Registry) > MAX_ACTIVE else None
 
     log.debug("Initialized the conversation and saved to Registry. ")
 
+    if evicted is not None:
+        log.info(
+            f"Registry is full ({MAX_ACTIVE}); evicting conversation {evicted.thread_id}"
+        )
+        await _close_and_save([evicted])
+
     # send tool calls to MCP server if there are Code variants present in messages
     if mcp_mgr is not None and any(isinstance(v, SVCode) for v in messages):
         loop = asyncio.get_running_loop()
@@ -146,7 +161,8 @@ async def add_to_conversation(
         if conv is None:
             raise ValueError("Conversation does not exist. Please initialize first!")
         conv.messages.extend(messages)
-        conv.last_activity = datetime.now(timezone.utc)
+        conv.last_activity = time.monotonic()
+        Registry.move_to_end(thread_id)
         return conv
 
 
@@ -155,9 +171,8 @@ async def get_conversation_state(thread_id: str) -> Optional[ConversationState]:
     Return the state of the conversation, or None if it is unknown.
     Does NOT create a conversation if missing.
     """
-    async with RegistryLock:
-        conv = Registry.get(thread_id)
-        return conv.state if conv is not None else None
+    conv = Registry.get(thread_id)
+    return conv.state if conv is not None else None
 
 
 async def get_conv_mcpmanager(thread_id: str) -> Optional[McpManager]:
@@ -165,19 +180,17 @@ async def get_conv_mcpmanager(thread_id: str) -> Optional[McpManager]:
     Return the MCPManager of the conversation, or None if it does not exist
     Does NOT create a conversation if missing.
     """
-    async with RegistryLock:
-        conv = Registry.get(thread_id)
-        return conv.mcp_manager if conv is not None else None
+    conv = Registry.get(thread_id)
+    return conv.mcp_manager if conv is not None else None
 
 
-async def get_conv_messages(thread_id: str) -> Optional[List[StreamVariant]]:
+async def get_conv_messages(thread_id: str) -> Optional[Deque[StreamVariant]]:
     """
     Return the messages of the conversation, or None if it does not exist
     Does NOT create a conversation if missing.
     """
-    async with RegistryLock:
-        conv = Registry.get(thread_id)
-        return conv.messages if conv is not None else None
+    conv = Registry.get(thread_id)
+    return conv.messages if conv is not None else None
 
 
 async def request_stop(thread_id: str) -> bool:
@@ -191,7 +204,8 @@ async def request_stop(thread_id: str) -> bool:
         if conv is None:
             return False
         conv.state = ConversationState.STOPPING
-        conv.last_activity = datetime.now(timezone.utc)
+        conv.last_activity = time.monotonic()
+        Registry.move_to_end(thread_id)
         return True
 
 
@@ -210,7 +224,8 @@ async def end_and_save_conversation(
             return False
         # End conversation
         conv.state = ConversationState.ENDED
-        conv.last_activity = datetime.now(timezone.utc)
+        conv.last_activity = time.monotonic()
+        Registry.move_to_end(thread_id)
         # Save conversation
         await Storage.save_thread(
             conv.thread_id, conv.user_id, conv.messages, append_to_existing=False
@@ -233,6 +248,39 @@ async def remove_conversation(thread_id: str) -> bool:
     return True
 
 
+def _pop_least_recent() -> Optional[ActiveConversation]:
+    """
+    Pop the least recently used conversation that has ENDED. Those were saved by
+    end_and_save_conversation with their owner's storage, so eviction does not
+    save them again. Must be called with RegistryLock held.
+    """
+    for thread_id, conv in Registry.items():
+        if conv.state == ConversationState.ENDED:
+            return Registry.pop(thread_id)
+    return None
+
+
+async def _close_and_save(
+    convs: List[ActiveConversation],
+    Storage: Optional[ThreadStorage] = None,
+) -> None:
+    """
+    Close the MCP managers of conversations that were removed from the Registry
+    and, if Storage is given, persist them. Call outside RegistryLock.
+    """
+    for conv in convs:
+        if conv.mcp_manager is not None:
+            # Ends the MCP sessions over HTTP, which blocks.
+            await asyncio.to_thread(conv.mcp_manager.close)
+
+    if Storage:
+        for conv in convs:
+            conv.state = ConversationState.ENDED
+            await Storage.save_thread(
+                conv.thread_id, conv.user_id, conv.messages, append_to_existing=False
+            )
+
+
 async def _replay_code_history(thread_id: str) -> None:
     """
     Replays all SVCode blocks for a conversation into the code-interpreter MCP server,
@@ -323,24 +371,27 @@ async def cleanup_idle(
 ) -> list[str]:  # thread_ids evicted
     """
     Remove conversations that have been idle longer than MAX_IDLE.
-    Each removed conversation is persisted via `end_and_save_conversation`.
+    If Storage is given, each removed conversation is saved to it.
     Returns a list of evicted thread_ids.
     """
-    now = datetime.now(timezone.utc)
-    to_evict: List[ActiveConversation] = []
-    evicted_ids: List[str] = []
-
-    # Decide which ones to evict under lock and remove them.
+    if not Registry:
+        return []
+    now = time.monotonic()
+    max_idle_s = max_idle.total_seconds()
+
+    # Decide which ones to evict under lock and remove them. Every touch of
+    # last_activity moves the entry to the end, so the Registry is ordered by
+    # it and the scan can stop at the first conversation that is not idle.
     async with RegistryLock:
-        for thread_id, conv in list(Registry.items()):
-            if now - conv.last_activity > max_idle:
-                evicted_ids.append(thread_id)
-                conv.mcp_manager.close()
-                to_evict.append(Registry.pop(thread_id))
-
-    # Persist outside the lock to avoid blocking other requests.
-    if Storage:
-        for conv in to_evict:
-            await end_and_save_conversation(conv.thread_id, Storage)
+        evicted_ids: List[str] = []
+        for thread_id, conv in Registry.items():
+            if now - conv.last_activity <= max_idle_s:
+                break
+            evicted_ids.append(thread_id)
+        to_evict = [Registry.pop(thread_id) for thread_id in evicted_ids]
+
+    # Close and persist outside the lock to avoid blocking other requests. The
+    # entries are no longer in the Registry, so they are saved directly.
+    await _close_and_save(to_evict, Storage)
 
     return evicted_ids
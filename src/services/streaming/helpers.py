@@ -1,10 +1,7 @@
-from ansi2html import Ansi2HTMLConverter
-
-
 # TODO: Frontend: sending html messages instead of stripping color codes
 # Jupyter sends the stdout or stderr as a string containing ANSI escape sequences
-# (color codes). We can send them as html messages.
-conv = Ansi2HTMLConverter(inline=True)
+# (color codes). For now they are stripped on the code server (strip_ansi); an
+# ANSI -> HTML converter can be added here once the frontend renders html.
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -1,9 +1,9 @@
 from __future__ import annotations
 import os
-import json
 from typing import Any, Dict, List, Optional, Iterable, AsyncIterator
 
 import httpx
+import orjson
 
 from src.core.settings import get_settings
 # ---------------------------------------------------------------------------
@@ -23,12 +23,35 @@ def _completions_url() -> str:
 AUTH_TOKEN = os.getenv("FREVAGPT_OPENAI_API_KEY", "")
 
 
+_TIMEOUT = httpx.Timeout(60.0, read=300.0, write=30.0, connect=30.0)
+# One client (and thus one keep-alive pool) to the proxy, shared process-wide.
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            timeout=_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared LiteLLM HTTP client; called once at application shutdown."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
 def _passthrough_params(params: Dict[str, Any] | None) -> Dict[str, Any]:
     # Tiny wrapper to allow future param sanitization
     return dict(params or {})
 
 
-def _headers() -> Dict[str, str]:
+def _build_headers() -> Dict[str, str]:
     h = {"Content-Type": "application/json"}
     # Authorization header is not required for Ollama models,
     # but sending it (when available) doesn’t hurt and satisfies OpenAI-routed calls.
@@ -37,12 +60,32 @@ def _headers() -> Dict[str, str]:
     return h
 
 
+# AUTH_TOKEN is read once at import, so the headers never change; httpx copies
+# them into each request, so sharing the dict is safe.
+_HEADERS = _build_headers()
+
+
 async def _post_json(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    timeout = httpx.Timeout(60.0, read=300.0, write=30.0, connect=30.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(url, json=payload, headers=_headers())
-        r.raise_for_status()
-        return r.json()
+    r = await _get_client().post(url, json=payload, headers=_HEADERS)
+    r.raise_for_status()
+    return r.json()
+
+
+async def _aiter_sse_lines(r: httpx.Response) -> AsyncIterator[bytearray]:
+    """
+    Split the raw byte stream into lines. One buffer is consumed in place, and
+    nothing is decoded to str since orjson parses the bytes directly.
+    """
+    buf = bytearray()
+    async for chunk in r.aiter_bytes():
+        buf += chunk
+        start = 0
+        while (nl := buf.find(b"\n", start)) != -1:
+            yield buf[start:nl]
+            start = nl + 1
+        del buf[:start]
+    if buf:
+        yield buf
 
 
 def _extract_text(resp: Any) -> str:
@@ -69,11 +112,13 @@ async def acomplete(
     Call LiteLLM /v1/chat/completions.
     - stream=False: return JSON dict
     - stream=True: return **async iterator** yielding OpenAI-style stream chunks (dicts)
+    A `messages` list is sent as is, not copied; don't mutate it until the
+    request has been sent.
     """
     url = _completions_url()
     payload: Dict[str, Any] = {
         "model": model,
-        "messages": list(messages),
+        "messages": messages if isinstance(messages, list) else list(messages),
         "stream": stream,
     }
     if temperature is not None:
@@ -89,27 +134,21 @@ async def acomplete(
     if not stream:
         return await _post_json(url, payload)
 
-    timeout = httpx.Timeout(60.0, read=300.0, write=30.0, connect=30.0)
-    client = httpx.AsyncClient(timeout=timeout)
+    client = _get_client()
 
     async def _aiter() -> AsyncIterator[Dict[str, Any]]:
-        try:
-            async with client.stream(
-                "POST", url, json=payload, headers=_headers()
-            ) as r:
-                r.raise_for_status()
-                async for line in r.aiter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-                    data = line[5:].strip()
-                    if data == "[DONE]":
-                        break
-                    try:
-                        yield json.loads(data)
-                    except json.JSONDecodeError:
-                        continue
-        finally:
-            await client.aclose()
+        async with client.stream("POST", url, json=payload, headers=_HEADERS) as r:
+            r.raise_for_status()
+            async for line in _aiter_sse_lines(r):
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                try:
+                    yield orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    continue
 
     return _aiter()
 
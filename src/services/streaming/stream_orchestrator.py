@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import re
+import time
 from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
 from dataclasses import dataclass
 
+import orjson
+
 from src.services.service_factory import Authenticator, ThreadStorage
 
 from src.services.streaming.litellm_client import acomplete, first_text
@@ -23,7 +24,7 @@ from src.services.streaming.stream_variants import (
 )
 from src.services.streaming.tool_calls import (
     run_tool_via_mcp,
-    accumulate_tool_calls,
+    accumulate_and_stream_code,
     finalize_tool_calls,
     parse_tool_result,
     FinalSummary,
@@ -58,6 +59,24 @@ class StreamState:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+# Shared fallback for missing sub-dicts in chunks; only read, never mutated.
+_EMPTY: Dict[str, Any] = {}
+
+
+# Adjacent assistant-text deltas are sent as one SSE frame: the buffer is
+# flushed once _COALESCE_S passed since the last frame, also while the upstream
+# pauses, or when it holds _COALESCE_MAX pieces.
+_COALESCE_S = 0.025
+_COALESCE_MAX = 16
+
+
+async def _run_tool_after(after: Optional[asyncio.Task], **kwargs: Any) -> str:
+    """Run a tool via MCP once `after` (if given) has finished, whatever its outcome."""
+    if after is not None:
+        await asyncio.wait([after])
+    return await run_tool_via_mcp(**kwargs)
+
+
 async def stream_with_tools(
     *,
     model: str,
@@ -93,43 +112,77 @@ async def stream_with_tools(
     accumulated_asst_text: List[str] = []
 
     if hasattr(resp, "__aiter__"):
-        call_id = ""
-        async for chunk in resp:  # type: ignore
-            choice = (chunk.get("choices") or [{}])[0]
-            delta = choice.get("delta") or {}
-
-            # assistant text
-            piece = delta.get("content") or ""
-            if piece:
-                accumulated_asst_text.append(piece)
-                yield SVAssistant(text=piece)
-
-            # tool call: stream code chunks live and accumulate deltas
-            tc_list = delta.get("tool_calls") or []
-            if tc_list:
-                accumulate_tool_calls({"choices": [{"delta": delta}]}, tool_agg)
-                tool_name = (
-                    tool_agg.get("by_index")[0].get("function").get("name")
-                    if tool_agg
-                    else None
-                )
-                for tc in tc_list:
-                    fn = tc.get("function") or {}
-                    call_id = tc.get("id", call_id)
-                    args_chunk = fn.get("arguments", "")
-                    if args_chunk and tool_name == "code_interpreter":
-                        # stream arguments chunk immediately
-                        yield SVCode(code=args_chunk, id=call_id)
-
-            #  end-of-message
-            if choice.get("finish_reason"):
-                break
+        text_buf: List[str] = []
+        last_flush = 0.0
+        chunks = resp.__aiter__()  # type: ignore
+        next_chunk: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if next_chunk is None and not text_buf:
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+                else:
+                    # Text is pending: wait for the next chunk only until its
+                    # frame is due, so a pause upstream does not hold it back.
+                    if next_chunk is None:
+                        next_chunk = asyncio.ensure_future(chunks.__anext__())
+                    due = last_flush + _COALESCE_S - time.monotonic()
+                    done, _ = await asyncio.wait(
+                        {next_chunk}, timeout=max(due, 0) if text_buf else None
+                    )
+                    if not done:
+                        yield SVAssistant(text="".join(text_buf))
+                        text_buf.clear()
+                        last_flush = time.monotonic()
+                        continue
+                    arrived, next_chunk = next_chunk, None
+                    try:
+                        chunk = arrived.result()
+                    except StopAsyncIteration:
+                        break
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                choice = choices[0]
+                delta = choice.get("delta") or _EMPTY
+
+                # assistant text, coalesced into fewer frames
+                piece = delta.get("content")
+                if piece:
+                    accumulated_asst_text.append(piece)
+                    text_buf.append(piece)
+                    now = time.monotonic()
+                    if (
+                        len(text_buf) >= _COALESCE_MAX
+                        or now - last_flush >= _COALESCE_S
+                    ):
+                        yield SVAssistant(text="".join(text_buf))
+                        text_buf.clear()
+                        last_flush = now
+
+                # tool call: stream code chunks live and accumulate deltas
+                if delta.get("tool_calls"):
+                    if text_buf:
+                        yield SVAssistant(text="".join(text_buf))
+                        text_buf.clear()
+                    for code_v in accumulate_and_stream_code(delta, tool_agg):
+                        yield code_v
+
+                #  end-of-message
+                if choice.get("finish_reason"):
+                    break
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+        if text_buf:
+            yield SVAssistant(text="".join(text_buf))
     else:
         full_txt = first_text(resp) or ""
-        for p in re.findall(r"\S+\s*", full_txt):
-            if p:
-                accumulated_asst_text.append(full_txt)
-                yield SVAssistant(text=full_txt)
+        if full_txt:
+            accumulated_asst_text.append(full_txt)
+            yield SVAssistant(text=full_txt)
 
     # 2) Any tool calls?
     tool_calls = finalize_tool_calls(tool_agg)
@@ -146,64 +199,61 @@ async def stream_with_tools(
         await add_to_conversation(thread_id, [end_v])
         return
 
-    # 3) Run tools
-    id = ""
+    # 3) Run tools. Independent calls run concurrently; code_interpreter calls
+    # share one kernel, so each of them waits for the previous one.
+    tool_tasks: List[asyncio.Task] = []
+    prev_code_task: Optional[asyncio.Task] = None
     for tc in tool_calls:
+        fn = tc.get("function") or _EMPTY
+        is_code = fn.get("name") == "code_interpreter"
+        tool_task = asyncio.create_task(
+            _run_tool_after(
+                prev_code_task if is_code else None,
+                mcp=mcp,
+                tool_name=fn.get("name", ""),
+                arguments_json=fn.get("arguments", ""),
+                logger=log,
+            )
+        )
+        if is_code:
+            prev_code_task = tool_task
+        await register_tool_task(thread_id, tool_task)
+        tool_tasks.append(tool_task)
+
+    try:
+        # While tools run, emit heartbeats every few seconds
+        pending = set(tool_tasks)
+        while pending:
+            yield await heartbeat_content()
+            _, pending = await asyncio.wait(pending, timeout=10)  # seconds
+    except BaseException:
+        # /stop, connection close or an error in the consumer
+        for t in tool_tasks:
+            t.cancel()
+        raise
+    finally:
+        # Ensure the tasks are removed from the registry when they finish
+        for t in tool_tasks:
+            await unregister_tool_task(thread_id, t)
+
+    # Results are handled in call order, so the thread stays in order.
+    id = ""
+    for tc, tool_task in zip(tool_calls, tool_tasks):
         messages.append({"role": "assistant", "content": "", "tool_calls": [tc]})
-        name = (tc.get("function") or {}).get("name", "")
+        fn = tc.get("function") or _EMPTY
+        name = fn.get("name", "")
         id = tc.get("id", id)
-        args_txt = (tc.get("function") or {}).get("arguments", "")
-
-        async def run_with_heartbeat():
-            """Run the tool while periodically sending heartbeats."""
-            tool_task = asyncio.create_task(
-                run_tool_via_mcp(
-                    mcp=mcp,
-                    tool_name=name,
-                    arguments_json=args_txt,
-                    logger=log,
-                )
-            )
-
-            await register_tool_task(thread_id, tool_task)
-
-            try:
-                # While tool runs, emit heartbeats every few seconds
-                while not tool_task.done():
-                    hb = await heartbeat_content()
-                    yield hb
-                    await asyncio.sleep(10)  # heartbeat interval (seconds)
-
-                # When done, return the final result text
-                result_text = await tool_task
-                yield result_text
-
-            except asyncio.CancelledError:
-                # /stop or connection close has cancelled this task
-                tool_task.cancel()
-                raise
-
-            except Exception:
-                tool_task.cancel()
-                raise
-
-            finally:
-                # Ensure the task is removed from the registry when it finishes
-                await unregister_tool_task(thread_id, tool_task)
-
-        try:
-            result_text = None
-            heartbeats_v: List[StreamVariant] = []
-            async for item in run_with_heartbeat():
-                if isinstance(item, SVServerHint):
-                    yield item  # Stream heartbeat ServerHint variants
-                    heartbeats_v.append(item)
-                elif isinstance(item, str):
-                    # The function returns the final tool result as last value
-                    result_text = item
-        except Exception as e:
-            log.exception("Tool %s failed", name)
-            result_text = json.dumps({"error": str(e)})
+        args_txt = fn.get("arguments", "")
+
+        if tool_task.cancelled():
+            # /stop has cancelled the tool
+            raise asyncio.CancelledError()
+        exc = tool_task.exception()
+        if exc is not None:
+            log.error("Tool %s failed", name, exc_info=exc)
+            result_text = orjson.dumps({"error": str(exc)}).decode()
+        else:
+            result_text = tool_task.result()
 
         # We will collect tool input and output as Stream Variants and append to thread
         tc_variants: List[StreamVariant] = []
@@ -223,7 +273,10 @@ async def stream_with_tools(
                 (
                     tool_out_v,
                     tool_msgs,
-                ) = r.var_block, r.tool_messages
+                ) = (
+                    r.var_block,
+                    r.tool_messages,
+                )
                 break
             else:
                 yield r  # Streaming the result to endpoint
@@ -5,6 +5,7 @@ import json
 import logging
 from pathlib import Path
 
+import orjson
 from pydantic import BaseModel, Field, ConfigDict
 
 """
@@ -66,6 +67,10 @@ class _SVBase(BaseModel):
 
     model_config = ConfigDict(frozen=True)  # make instances hashable/immutable
 
+    # Memoized wire dict, see from_sv_to_json(). A plain slot rather than a
+    # field or private attr, so it stays out of equality, hashing and dumps.
+    __slots__ = ("_wire",)
+
 
 class SVPrompt(_SVBase):
     # IMPORTANT: use string literals inside Literal[...] to satisfy type-checkers
@@ -255,9 +260,13 @@ class OpenAIMessage(TypedDict, total=False):
 def _as_system(name: str, content: Union[str, dict, list]) -> OpenAIMessage:
     if not isinstance(content, str):
         try:
-            content = json.dumps(content, ensure_ascii=False)
-        except Exception:
-            content = str(content)
+            content = orjson.dumps(content).decode()
+        except TypeError:
+            # e.g. non-str keys or ints beyond 64 bit, which orjson rejects
+            try:
+                content = json.dumps(content, ensure_ascii=False)
+            except Exception:
+                content = str(content)
     return {"role": ROLE_SYSTEM, "name": name, "content": content}
 
 
@@ -322,7 +331,7 @@ def mcp_tool_to_openai_function(tool: Dict[str, Any]) -> Dict[str, Any]:
 
 def _extend_with_prompt_json(out: List[OpenAIMessage], json_str: str) -> None:
     try:
-        data = json.loads(json_str)
+        data = orjson.loads(json_str)
     except Exception as e:
         logger.warning(
             "Failed to parse Prompt JSON payload: %s; skipping this Prompt variant.", e
@@ -417,6 +426,17 @@ def help_convert_sv_ccrm(
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+_FROM_JSON_TEXT = {
+    ASSISTANT: lambda text: SVAssistant(text=text),
+    USER: lambda text: SVUser(text=text),
+    PROMPT: lambda text: SVPrompt(payload=text),
+    SERVER_ERROR: lambda text: SVServerError(message=text),
+    CODE_ERROR: lambda text: SVCodeError(message=text),
+    OPENAI_ERROR: lambda text: SVOpenAIError(message=text),
+    STREAM_END: lambda text: SVStreamEnd(message=text),
+}
+
+
 def from_json_to_sv(obj: dict) -> StreamVariant:
     """
     Convert a json/dict into class-based StreamVariant.
@@ -430,22 +450,12 @@ def from_json_to_sv(obj: dict) -> StreamVariant:
     v = obj.get("variant")
     c = obj.get("content")
 
-    if v == ASSISTANT:
-        return SVAssistant(text="" if c is None else str(c))
-    if v == USER:
-        return SVUser(text="" if c is None else str(c))
-    if v == PROMPT:
-        return SVPrompt(payload="" if c is None else str(c))
+    # Variants whose content is a single text field: one dict lookup.
+    make = _FROM_JSON_TEXT.get(v)
+    if make is not None:
+        return make("" if c is None else str(c))
     if v == SERVER_HINT:
-        return SVServerHint(data=c if isinstance(c, dict) else json.loads(c))
-    if v == SERVER_ERROR:
-        return SVServerError(message="" if c is None else str(c))
-    if v == CODE_ERROR:
-        return SVCodeError(message="" if c is None else str(c))
-    if v == OPENAI_ERROR:
-        return SVOpenAIError(message="" if c is None else str(c))
-    if v == STREAM_END:
-        return SVStreamEnd(message="" if c is None else str(c))
+        return SVServerHint(data=c if isinstance(c, dict) else orjson.loads(c))
     if v == IMAGE:
         return SVImage(b64="" if c is None else str(c), id=obj.get("id"))
 
@@ -497,46 +507,58 @@ def from_json_to_sv(obj: dict) -> StreamVariant:
 def from_sv_to_json(v: StreamVariant) -> SVDict:
     """
     Convert Pydantic class back to json/dict.
+    Variants are immutable, so the dict is built once and memoized on the
+    instance: a variant is serialized when streamed and again on every save.
+    The returned dict is shared and must not be modified.
     """
-    d = v.model_dump()
-    kind = d["variant"]
+    wire = getattr(v, "_wire", None)
+    if wire is None:
+        wire = _sv_to_wire(v)
+        object.__setattr__(v, "_wire", wire)
+    return wire
+
+
+def _sv_to_wire(v: StreamVariant) -> SVDict:
+    # Reads the fields directly instead of going through model_dump(), which
+    # would build (and copy) a full intermediate dict for every variant.
+    kind = v.variant
     if kind == USER:
-        return {"variant": USER, "content": d["text"]}
+        return {"variant": USER, "content": v.text}
     if kind == ASSISTANT:
-        return {"variant": ASSISTANT, "content": d["text"]}
+        return {"variant": ASSISTANT, "content": v.text}
     if kind == PROMPT:
-        return {"variant": PROMPT, "content": d["payload"]}
+        return {"variant": PROMPT, "content": v.payload}
     if kind == SERVER_HINT:
-        return {"variant": SERVER_HINT, "content": d["data"]}
+        return {"variant": SERVER_HINT, "content": v.data}
     if kind == SERVER_ERROR:
-        return {"variant": SERVER_ERROR, "content": d["message"]}
+        return {"variant": SERVER_ERROR, "content": v.message}
     if kind == CODE_ERROR:
-        return {"variant": CODE_ERROR, "content": [d["message"]]}
+        return {"variant": CODE_ERROR, "content": [v.message]}
     if kind == OPENAI_ERROR:
-        return {"variant": OPENAI_ERROR, "content": d["message"]}
+        return {"variant": OPENAI_ERROR, "content": v.message}
     if kind == STREAM_END:
-        return {"variant": STREAM_END, "content": d["message"]}
+        return {"variant": STREAM_END, "content": v.message}
     if kind == IMAGE:
-        return {"variant": IMAGE, "content": d["b64"], "id": d["id"]}
+        return {"variant": IMAGE, "content": v.b64, "id": v.id}
     if kind == CODE:
-        return {"variant": CODE, "content": d["code"], "id": d["id"]}
+        return {"variant": CODE, "content": v.code, "id": v.id}
     if kind == CODE_OUTPUT:
-        return {"variant": CODE_OUTPUT, "content": d["output"], "id": d["id"]}
+        return {"variant": CODE_OUTPUT, "content": v.output, "id": v.id}
     if kind == TOOL_CALL:
         return {
             "variant": TOOL_CALL,
-            "content": d["arg"],
-            "tool_name": d["tool_name"],
-            "id": d["id"],
+            "content": v.arg,
+            "tool_name": v.tool_name,
+            "id": v.id,
         }
     if kind == TOOL_OUTPUT:
         return {
             "variant": TOOL_OUTPUT,
-            "content": d["output"],
-            "tool_name": d["tool_name"],
-            "id": d["id"],
+            "content": v.output,
+            "tool_name": v.tool_name,
+            "id": v.id,
         }
-    return d
+    return v.model_dump()
 
 
 def parse_examples_jsonl(path: str | Path) -> list[StreamVariant]:
@@ -547,15 +569,24 @@ def parse_examples_jsonl(path: str | Path) -> list[StreamVariant]:
     p = Path(path)
     if not p.exists():
         return out
-    for raw in p.read_text(encoding="utf-8", errors="ignore").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("//"):
-            continue
-        try:
-            obj = json.loads(line)
-        except Exception:
-            # keep quiet but skip — examples may include comments / non-json lines
-            continue
+    # Read as bytes, which orjson parses directly, skipping blanks and comments.
+    with p.open("rb") as f:
+        lines = [
+            line for raw in f if (line := raw.strip()) and not line.startswith(b"//")
+        ]
+    # Parse all lines as one JSON array in a single call; only if some line
+    # is not valid JSON, fall back to parsing (and skipping) line by line.
+    try:
+        objs = orjson.loads(b"[" + b",".join(lines) + b"]")
+    except orjson.JSONDecodeError:
+        objs = []
+        for i, line in enumerate(lines):
+            try:
+                objs.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # keep quiet but skip — examples may include comments / non-json lines
+                logger.debug("Skipping non-JSON line %d in %s", i, p)
+    for obj in objs:
         if isinstance(obj, dict) and "variant" in obj:
             try:
                 out.append(from_json_to_sv(obj))
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import time
 
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
+import orjson
+
 from src.services.service_factory import McpManager
 from src.core.logging_setup import configure_logging
 
 from src.services.streaming.stream_variants import (
     SVUser,
+    SVCode,
     SVCodeOutput,
     SVImage,
     SVToolOutput,
@@ -22,6 +26,18 @@ from src.services.streaming.stream_variants import (
 
 DEFAULT_LOGGER = configure_logging(__name__)
 
+# Results of side-effect-free tools, keyed by (server, headers identity, tool,
+# canonical args). The headers identity keeps users apart: the RAG server reads
+# the caller's own mongodb-uri and Authorization headers. Only allowlisted tools
+# are cached: code_interpreter changes kernel state, and web search results go
+# stale.
+_CACHEABLE_TOOLS = frozenset({"get_context_from_resources"})
+_TOOL_CACHE_TTL_S = 600.0
+_TOOL_CACHE_MAX = 1024
+_TOOL_CACHE: "OrderedDict[Tuple[Any, str, str, bytes], Tuple[float, str]]" = (
+    OrderedDict()
+)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # MCP tool runner
 # ──────────────────────────────────────────────────────────────────────────────
@@ -36,71 +52,116 @@ async def run_tool_via_mcp(
 ) -> str:
     log = logger or DEFAULT_LOGGER
     try:
-        args = json.loads(arguments_json or "{}")
+        args = orjson.loads(arguments_json or "{}")
     except Exception:
         args = {"_raw": arguments_json}
 
     server_name = mcp.get_server_from_tool(tool_name)
 
+    key = None
+    if tool_name in _CACHEABLE_TOOLS:
+        key = (
+            server_name,
+            mcp.headers_identity(server_name),
+            tool_name,
+            orjson.dumps(args, option=orjson.OPT_SORT_KEYS),
+        )
+        hit = _TOOL_CACHE.get(key)
+        if hit and time.monotonic() - hit[0] < _TOOL_CACHE_TTL_S:
+            _TOOL_CACHE.move_to_end(key)
+            log.info(f"Tool call served from cache:\nname : {tool_name}")
+            return hit[1]
+
     log.info(f"Executing tool call:\nname : {tool_name}   arguments : {args}")
     # Run the blocking MCP call in a thread so cancellation of the coroutine
     # doesn’t block the event loop.
-    loop = asyncio.get_running_loop()
-    res = await loop.run_in_executor(
-        None,
-        lambda: mcp.call_tool(
-            server_name,
-            name=tool_name,
-            arguments=args,
-        ),
+    res = await asyncio.to_thread(
+        mcp.call_tool,
+        server_name,
+        name=tool_name,
+        arguments=args,
     )
 
-    return json.dumps(res)
+    # Results are free-form, so allow non-str keys as json.dumps did.
+    out = orjson.dumps(res, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    cacheable = (
+        key is not None
+        and isinstance(res, dict)
+        and not res.get("isError")
+        and not res.get("error")
+    )
+    if cacheable:
+        _TOOL_CACHE[key] = (time.monotonic(), out)
+        _TOOL_CACHE.move_to_end(key)
+        while len(_TOOL_CACHE) > _TOOL_CACHE_MAX:
+            _TOOL_CACHE.popitem(last=False)
+    return out
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Tool-call accumulation helpers (OpenAI-style deltas)
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Shared fallback for missing sub-dicts in deltas; only read, never mutated.
+_EMPTY: Dict[str, Any] = {}
 
-def accumulate_tool_calls(delta: Dict[str, Any], agg: Dict[str, Any]) -> None:
-    choices = delta.get("choices") or []
-    if not choices:
-        return
-    d = choices[0].get("delta") or {}
-    tc_list = d.get("tool_calls") or []
+
+def accumulate_and_stream_code(
+    delta: Dict[str, Any], agg: Dict[str, Any]
+) -> Iterator[SVCode]:
+    """
+    Accumulate the tool-call pieces of a choice's delta into `agg` (read back
+    with finalize_tool_calls). In the same pass, yields each code_interpreter
+    argument piece as an SVCode so the code can be streamed to the client while
+    it is generated.
+    """
+    tc_list = delta.get("tool_calls")
     if not tc_list:
         return
 
-    store: Dict[int, Dict[str, Any]] = agg.setdefault("by_index", {})  # type: ignore
+    # Indexed by the delta's index. Indices arrive in order from 0, so the
+    # list keeps them sorted; a skipped index stays None.
+    store: List[Optional[Dict[str, Any]]] = agg.setdefault("by_index", [])
     for item in tc_list:
         idx = item.get("index")
         if idx is None:
             continue
-        entry = store.setdefault(
-            idx, {"type": "function", "function": {"name": "", "arguments": ""}}
-        )
+        while len(store) <= idx:
+            store.append(None)
+        entry = store[idx]
+        if entry is None:
+            # Argument pieces are collected in a list and joined once in
+            # finalize_tool_calls; += would copy the whole string on every delta.
+            entry = store[idx] = {
+                "type": "function",
+                "function": {"name": "", "arguments": []},
+            }
         if item.get("id"):
             entry["id"] = item["id"]
-        f = item.get("function") or {}
+        fn = entry["function"]
+        f = item.get("function") or _EMPTY
         if f.get("name"):
-            entry["function"]["name"] = f["name"]
-        if f.get("arguments"):
-            entry["function"]["arguments"] = (
-                entry["function"].get("arguments", "") + f["arguments"]
-            )
+            fn["name"] = f["name"]
+        args_chunk = f.get("arguments")
+        if args_chunk:
+            fn["arguments"].append(args_chunk)
+            if fn["name"] == "code_interpreter":
+                yield SVCode(code=args_chunk, id=entry.get("id", ""))
 
 
 def finalize_tool_calls(agg: Dict[str, Any]) -> List[Dict[str, Any]]:
-    store = agg.get("by_index") or {}
+    store = agg.get("by_index") or []
     out: List[Dict[str, Any]] = []
-    for idx in sorted(store.keys()):
-        tc = store[idx]
-        fn = tc.get("function") or {}
+    for tc in store:
+        if tc is None:
+            continue
+        fn = tc.get("function") or _EMPTY
         tc.setdefault("type", "function")
+        args = fn.get("arguments") or ""
         tc["function"] = {
             "name": fn.get("name", ""),
-            "arguments": fn.get("arguments", ""),
+            "arguments": "".join(args) if isinstance(args, list) else args,
         }
         out.append(tc)
     return out
@@ -118,7 +179,7 @@ class FinalSummary:
 
 def parse_tool_result(resp_txt: str, tool_name: str, call_id: str, logger=None):
     log = logger or DEFAULT_LOGGER
-    result_json = json.loads(resp_txt)
+    result_json = orjson.loads(resp_txt)
 
     structured_content = result_json.get("structuredContent")
     if structured_content is not None:
@@ -157,19 +218,18 @@ def parse_code_interpreter_result(result: Dict, id: str, logger=None):
 
     # Code output: structured dict of displayed data, image or error
 
-    # Printed/displayed output + error message if exists
-    out = (
-        ""
-        + (("\n" + result["stdout"]) if result["stdout"] else "")
-        + (("\n" + result["result_repr"]) if result["result_repr"] else "")
-    )
-    out_error = (("\n" + result["stderr"]) if result["stderr"] else "") + (
-        ("\n" + result["error"]) if result["error"] else ""
+    # Printed/displayed output + error message if exists, each on its own line.
+    # An empty string is fine too: we must send something, the model expects it.
+    codeout = "".join(
+        "\n" + part
+        for part in (
+            result.get("stdout"),
+            result.get("result_repr"),
+            result.get("stderr"),
+            result.get("error"),
+        )
+        if part
     )
-    if out or out_error:
-        codeout = out + out_error
-    else:
-        codeout = ""  # We must send something here, the model expects it.
     codeout_v = SVCodeOutput(output=codeout, id=id)
     yield codeout_v
     code_block.append(codeout_v)
@@ -200,8 +260,8 @@ def parse_code_interpreter_result(result: Dict, id: str, logger=None):
             yield json_v
             code_block.append(json_v)
             code_msgs.extend(help_convert_sv_ccrm([json_v]))
-    isError = True if out_error else False
-    yield FinalSummary(var_block=code_block, tool_messages=code_msgs, is_error=isError)
+    is_error = bool(result.get("stderr") or result.get("error"))
+    yield FinalSummary(var_block=code_block, tool_messages=code_msgs, is_error=is_error)
 
 
 def parse_generic_tool_result(result: Dict, tool_name: str, id: str, logger=None):
@@ -8,10 +8,14 @@ from src.core.logging_setup import configure_logging
 
 logger = configure_logging(__name__, named_log="code_server")
 
+_ANSI_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
 
 def strip_ansi(text: str) -> str:
-    ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-    return ansi_escape.sub("", text)
+    # Most output has no escapes at all; every match starts with ESC.
+    if "\x1b" not in text:
+        return text
+    return _ANSI_RE.sub("", text)
 
 
 def sanitize_code(code: str) -> str:
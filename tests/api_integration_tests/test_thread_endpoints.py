@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/api/chatbot/setthreadtopic", {"thread_id": "t-missing", "topic": "x"}),
+        ("/api/chatbot/deletethread", {"thread_id": "t-missing"}),
+    ],
+)
+async def test_thread_updates_return_404_when_thread_missing(
+    stub_resp, client, patch_db, patch_mongo_uri, GOOD_HEADERS, path, params
+):
+    with stub_resp:
+        async with client:
+            r = await client.get(path, params=params, headers=GOOD_HEADERS)
+
+            assert r.status_code == 404
+            assert r.json()["detail"] == "Thread not found."
+
+
+@pytest.mark.asyncio
+async def test_thread_updates_succeed_for_existing_thread(
+    stub_resp, client, patch_db, patch_mongo_uri, GOOD_HEADERS
+):
+    from src.services.storage.mongodb_storage import MONGODB_COLLECTION_NAME
+
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    coll.storage["t-1"] = {"thread_id": "t-1", "user_id": "alice", "topic": "old"}
+
+    with stub_resp:
+        async with client:
+            r = await client.get(
+                "/api/chatbot/setthreadtopic",
+                params={"thread_id": "t-1", "topic": "new"},
+                headers=GOOD_HEADERS,
+            )
+            assert r.status_code == 200
+            assert coll.storage["t-1"]["topic"] == "new"
+
+            r = await client.get(
+                "/api/chatbot/deletethread",
+                params={"thread_id": "t-1"},
+                headers=GOOD_HEADERS,
+            )
+            assert r.status_code == 200
+            assert "t-1" not in coll.storage
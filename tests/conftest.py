@@ -2,7 +2,8 @@
 import pytest
 import httpx
 
-import os, sys
+import os, re, sys
+from collections import OrderedDict
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -91,6 +92,42 @@ def stub_resp(respx_mock):
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+def _matches(doc, filt):
+    for key, cond in filt.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and "$exists" in cond:
+            if (key in doc) != cond["$exists"]:
+                return False
+        elif isinstance(cond, dict) and "$all" in cond:
+            if not set(cond["$all"]) <= set(doc.get(key, [])):
+                return False
+        elif isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif isinstance(cond, dict) and "$regex" in cond:
+            flags = re.I if "i" in cond.get("$options", "") else 0
+            if not re.search(cond["$regex"], doc.get(key, ""), flags):
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    # Conditional removal, only in read_thread's form:
+    # {"$cond": [{"$eq": ["$field", value]}, "$$REMOVE", "$content"]}
+    for key, val in projection.items():
+        if isinstance(val, dict):
+            field, value = val["$cond"][0]["$eq"]
+            if doc.get(field[1:]) == value:
+                doc = {k: v for k, v in doc.items() if k != key}
+    keep = {k for k, v in projection.items() if v}
+    drop = {k for k, v in projection.items() if not v}
+    return {k: v for k, v in doc.items() if (k in keep if keep else k not in drop)}
+
+
 class DummyCollection:
     def __init__(self):
         self.storage = {}
@@ -100,24 +137,37 @@ class DummyCollection:
             self._docs = docs
             self._limit = None
 
-        def sort(self, *args, **kwargs):
+        def sort(self, key, direction=1):
+            self._docs = sorted(
+                self._docs, key=lambda d: d.get(key), reverse=direction < 0
+            )
+            return self
+
+        def skip(self, n):
+            self._docs = self._docs[n:]
             return self
 
         def limit(self, n):
-            self._limit = n
+            self._limit = n or None  # limit(0) means no limit
             return self
 
         async def to_list(self, length):
-            docs = list(self._docs.values())
+            docs = list(self._docs)
             if length is not None:
                 docs = docs[:length]
             return docs[: self._limit] if self._limit is not None else docs
 
-    async def find_one(self, q):
-        return self.storage.get(q.get("thread_id"))
+    async def find_one(self, q, projection=None):
+        doc = self.storage.get(q.get("thread_id"))
+        if doc is None or not projection:
+            return doc
+        return _project(doc, projection)
 
-    def find(self, q):
-        return self._Cursor(self.storage)
+    def find(self, q, projection=None):
+        docs = [d for d in self.storage.values() if _matches(d, q)]
+        if projection:
+            docs = [_project(d, projection) for d in docs]
+        return self._Cursor(docs)
 
     async def insert_one(self, doc):
         self.storage[doc["thread_id"]] = doc
@@ -125,22 +175,39 @@ class DummyCollection:
 
     async def update_one(self, query, update, upsert=False):
         tid = query.get("thread_id")
-        doc = update.get("$set", update)
-        self.storage[tid] = doc
-        return None
+        doc = self.storage.get(tid)
+        if doc is None or not _matches(doc, query):
+            if not upsert:
+                return SimpleNamespace(matched_count=0, modified_count=0)
+            doc = self.storage[tid] = {"thread_id": tid}
+            doc.update(update.get("$setOnInsert", {}))
+            matched = 0
+        else:
+            matched = 1
+        if not any(k.startswith("$") for k in update):
+            update = {"$set": update}  # plain replacement document
+        doc.update(update.get("$set", {}))
+        for key, val in update.get("$push", {}).items():
+            doc.setdefault(key, []).extend(val["$each"])
+        return SimpleNamespace(matched_count=matched, modified_count=1)
+
+    async def bulk_write(self, ops, ordered=True):
+        upserted = modified = 0
+        for op in ops:
+            res = await self.update_one(op._filter, op._doc, upsert=op._upsert)
+            upserted += not res.matched_count
+            modified += res.matched_count
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
 
     async def delete_one(self, query):
         tid = query.get("thread_id")
-        self.storage.pop(tid, None)
-        return None
+        deleted = self.storage.pop(tid, None) is not None
+        return SimpleNamespace(deleted_count=int(deleted))
 
     async def count_documents(self, q):
-        user_id = q.get("user_id")
-        if user_id is None:
-            return len(self.storage)
-        return sum(1 for doc in self.storage.values() if doc.get("user_id") == user_id)
+        return sum(1 for doc in self.storage.values() if _matches(doc, q))
 
-    async def create_index(self, ind, unique=False):
+    async def create_index(self, ind, unique=False, **kwargs):
         pass
 
 
@@ -169,6 +236,13 @@ def patch_db(monkeypatch, dummy_db, GOOD_HEADERS):
         fake_get_database,
         raising=True,
     )
+    # Fresh DB per test, so no listings cached by an earlier one
+    monkeypatch.setattr(
+        "src.services.storage.mongodb_storage._LIST_CACHE", OrderedDict()
+    )
+    monkeypatch.setattr(
+        "src.services.storage.mongodb_storage._THREAD_CACHE", OrderedDict()
+    )
     return dummy_db
 
 
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+import pytest
+
+from src.services.streaming import active_conversations as AC
+from src.services.streaming.stream_variants import SVUser
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.saved = []
+
+    async def save_thread(self, thread_id, user_id, content, append_to_existing):
+        self.saved.append((thread_id, user_id))
+
+
+@pytest.mark.asyncio
+async def test_full_registry_evicts_ended_conversation_without_saving(monkeypatch):
+    async def no_mcp(authenticator, thread_id):
+        return None
+
+    monkeypatch.setattr(AC, "get_mcp_manager", no_mcp)
+    monkeypatch.setattr(AC, "Registry", OrderedDict())
+    monkeypatch.setattr(AC, "MAX_ACTIVE", 2)
+    storage_alice, storage_bob = RecordingStorage(), RecordingStorage()
+
+    # Alice's conversation ends and is saved with her own storage.
+    await AC.initialize_conversation("t-alice", "alice", [], auth=None)
+    await AC.add_to_conversation("t-alice", [SVUser(text="hi")])
+    assert await AC.end_and_save_conversation("t-alice", storage_alice)
+
+    # Bob's requests fill the registry; Alice's ended conversation is evicted,
+    # the still streaming one of Bob is kept.
+    await AC.initialize_conversation("t-bob-1", "bob", [], auth=None)
+    await AC.initialize_conversation("t-bob-2", "bob", [], auth=None)
+
+    assert list(AC.Registry) == ["t-bob-1", "t-bob-2"]
+    assert storage_alice.saved == [("t-alice", "alice")]
+    assert storage_bob.saved == []
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+
+import pytest
+
+from src.services.streaming import active_conversations as AC
+from src.services.streaming import stream_orchestrator as SO
+from src.services.streaming.stream_orchestrator import StreamState, stream_with_tools
+from src.services.streaming.stream_variants import SVServerHint
+
+
+def _text(piece):
+    return {"choices": [{"delta": {"content": piece}}]}
+
+
+_STOP = {"choices": [{"delta": {}, "finish_reason": "stop"}]}
+
+
+def _tool_calls(*calls):
+    """A completion that asks for the given (name, arguments) tool calls."""
+
+    async def acomplete(**kwargs):
+        async def gen():
+            for i, (name, args) in enumerate(calls):
+                fn = {"name": name, "arguments": orjson.dumps(args).decode()}
+                yield {
+                    "choices": [
+                        {
+                            "delta": {
+                                "tool_calls": [
+                                    {"index": i, "id": f"id{i}", "function": fn}
+                                ]
+                            }
+                        }
+                    ]
+                }
+            yield {"choices": [{"delta": {}, "finish_reason": "tool_calls"}]}
+
+        return gen()
+
+    return acomplete
+
+
+class FakeMcp:
+    """Runs each tool for `duration_s` and records when it ran."""
+
+    def __init__(self, duration_s=0.15):
+        self.duration_s = duration_s
+        self.ran = {}
+        self._lock = threading.Lock()
+
+    def openai_tools(self):
+        return [{"type": "function", "function": {"name": "any"}}]
+
+    def get_server_from_tool(self, tool_name):
+        return "code" if tool_name == "code_interpreter" else "web"
+
+    def call_tool(self, server, *, name, arguments):
+        started = time.monotonic()
+        time.sleep(self.duration_s)
+        with self._lock:
+            self.ran[arguments.get("label", name)] = (started, time.monotonic())
+        if name == "broken":
+            raise RuntimeError("boom")
+        if name == "code_interpreter":
+            return {"structuredContent": {"stdout": arguments["label"]}}
+        return {"structuredContent": {"result": arguments["label"]}}
+
+
+@pytest.fixture
+def conversation(monkeypatch):
+    """Start conversation "t" with the given MCP manager (None by default)."""
+    monkeypatch.setattr(AC, "Registry", OrderedDict())
+
+    async def heartbeat():
+        return SVServerHint(data={"heartbeat": True})
+
+    monkeypatch.setattr(SO, "heartbeat_content", heartbeat)
+
+    async def start(mcp=None):
+        async def get_mcp(authenticator, thread_id):
+            return mcp
+
+        monkeypatch.setattr(AC, "get_mcp_manager", get_mcp)
+        await AC.initialize_conversation("t", "alice", [], auth=None)
+        return "t"
+
+    return start
+
+
+async def _collect(acomplete_func, messages=None):
+    started = time.monotonic()
+    out = []
+    async for v in stream_with_tools(
+        model="m",
+        thread_id="t",
+        messages=[] if messages is None else messages,
+        acomplete_func=acomplete_func,
+        stream_state=StreamState(),
+    ):
+        out.append((time.monotonic() - started, v))
+    return out
+
+
+@pytest.mark.asyncio
+async def test_text_is_flushed_while_upstream_pauses(conversation):
+    await conversation()
+    burst = [f"d{i} " for i in range(20)]
+
+    async def acomplete(**kwargs):
+        async def gen():
+            for piece in burst:
+                yield _text(piece)
+            await asyncio.sleep(0.3)  # e.g. the model thinking
+            yield _text("end")
+            yield _STOP
+
+        return gen()
+
+    out = await _collect(acomplete)
+    frames = [(at, v.text) for at, v in out if v.variant == "Assistant"]
+
+    # The first delta goes out at once, then at most _COALESCE_MAX per frame;
+    # the rest of the burst is sent during the pause, not after it.
+    assert [text for _, text in frames] == [
+        "d0 ",
+        "".join(burst[1 : 1 + SO._COALESCE_MAX]),
+        "".join(burst[1 + SO._COALESCE_MAX :]),
+        "end",
+    ]
+    assert frames[2][0] < 0.2
+    assert out[-1][1].variant == "StreamEnd"
+    messages = await AC.get_conv_messages("t")
+    assert messages[0].text == "".join(burst) + "end"
+
+
+@pytest.mark.asyncio
+async def test_tools_run_concurrently_and_results_stay_in_call_order(conversation):
+    mcp = FakeMcp()
+    await conversation(mcp)
+    messages = []
+
+    out = await _collect(
+        _tool_calls(
+            ("code_interpreter", {"label": "code 1"}),
+            ("web_search", {"label": "search"}),
+            ("code_interpreter", {"label": "code 2"}),
+            ("broken", {"label": "broken"}),
+        ),
+        messages,
+    )
+
+    # Independent tools overlap, code_interpreter calls share the kernel and
+    # run one after the other.
+    assert mcp.ran["search"][0] < mcp.ran["code 1"][1]
+    assert mcp.ran["broken"][0] < mcp.ran["code 1"][1]
+    assert mcp.ran["code 2"][0] >= mcp.ran["code 1"][1]
+    assert out[-1][0] < 3 * mcp.duration_s
+
+    # Results are handled in call order; a failing tool becomes an error result.
+    calls = [m["tool_calls"][0]["id"] for m in messages if m.get("tool_calls")]
+    assert calls == ["id0", "id1", "id2", "id3"]
+    thread = await AC.get_conv_messages("t")
+    assert [v.variant for v in thread] == [
+        "Code",
+        "CodeOutput",
+        "ToolCall",
+        "ToolOutput",
+        "Code",
+        "CodeOutput",
+        "ToolCall",
+        "ToolOutput",
+    ]
+    assert [v.output for v in thread if hasattr(v, "output")] == [
+        "\ncode 1",
+        "search",
+        "\ncode 2",
+        "broken error: boom",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_tool_cancels_the_stream(conversation):
+    await conversation(FakeMcp(duration_s=0.3))
+    stream = stream_with_tools(
+        model="m",
+        thread_id="t",
+        messages=[],
+        acomplete_func=_tool_calls(("web_search", {"label": "search"})),
+        stream_state=StreamState(),
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        async for v in stream:
+            if v.variant == "ServerHint":  # the first heartbeat: tools run
+                await AC.cancel_tool_tasks("t")
+    assert not AC.Registry["t"].tool_tasks
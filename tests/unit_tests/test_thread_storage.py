@@ -45,6 +45,7 @@ async def test_save_and_read_thread(monkeypatch, patch_db, GOOD_HEADERS):
 
     coll = patch_db[MONGODB_COLLECTION_NAME]
     assert tid in coll.storage
+    assert coll.storage[tid]["topic"] == "topic"
 
     # Read back as wire variants (dicts)
     conv = await storage.read_thread(tid)
@@ -52,3 +53,242 @@ async def test_save_and_read_thread(monkeypatch, patch_db, GOOD_HEADERS):
     # Prompt, User, Assistant, StreamEnd (no unexpected extra StreamEnd)
     assert kinds == ["Prompt", "User", "Assistant", "StreamEnd"]
     assert coll.storage[tid]["content"] == conv
+
+
+@pytest.mark.asyncio
+async def test_list_and_search_threads(patch_db, GOOD_HEADERS):
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    for i, topic in enumerate(["Climate data", "Precipitation maps", "Climatology"]):
+        coll.storage[f"T{i}"] = {
+            "user_id": "alice",
+            "thread_id": f"T{i}",
+            "date": f"2025-01-0{i + 1}",
+            **mongo_storage._topic_fields(topic),
+            "content": [],
+        }
+    coll.storage["other"] = dict(coll.storage["T0"], user_id="bob", thread_id="other")
+
+    threads, total = await storage.list_recent_threads("alice", limit=2, page=0)
+    assert total == 3
+    assert [t.thread_id for t in threads] == ["T2", "T1"]
+
+    total, threads = await storage.query_by_topic("alice", "climate data", 10, 0)
+    assert (total, [t.thread_id for t in threads]) == (1, ["T0"])
+
+    total, threads = await storage.query_by_topic("alice", "Clim", 10, 0)
+    assert (total, [t.thread_id for t in threads]) == (2, ["T2", "T0"])
+    total, threads = await storage.query_by_topic("alice", "itation m", 10, 0)
+    assert (total, [t.thread_id for t in threads]) == (1, ["T1"])
+
+    # Whole-word and substring-only matches are found together, one total.
+    coll.storage["T3"] = {
+        "user_id": "alice",
+        "thread_id": "T3",
+        "date": "2025-01-04",
+        **mongo_storage._topic_fields("Paleoclimate records"),
+        "content": [],
+    }
+    total, threads = await storage.query_by_topic("alice", "climate", 1, 1)
+    assert (total, [t.thread_id for t in threads]) == (2, ["T0"])
+
+
+@pytest.mark.asyncio
+async def test_search_finds_threads_without_topic_trigrams(patch_db, GOOD_HEADERS):
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    # Written before topic_lc/topic_tg existed, or by another writer.
+    coll.storage["old"] = {
+        "user_id": "alice",
+        "thread_id": "old",
+        "date": "2025-01-01",
+        "topic": "Precipitation maps",
+        "content": [],
+    }
+    coll.storage["new"] = {
+        "user_id": "alice",
+        "thread_id": "new",
+        "date": "2025-01-02",
+        **mongo_storage._topic_fields("Precipitation trends"),
+        "content": [],
+    }
+
+    total, threads = await storage.query_by_topic("alice", "PRECIP", 10, 0)
+    assert (total, [t.thread_id for t in threads]) == (2, ["new", "old"])
+
+
+@pytest.mark.asyncio
+async def test_cancelled_summary_is_retried_on_next_save(
+    monkeypatch, patch_db, GOOD_HEADERS
+):
+    import asyncio
+
+    started = asyncio.Event()
+
+    async def hanging_topic(content):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(mongo_storage, "summarize_topic", hanging_topic)
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+
+    # The client disconnects while the topic is being summarized.
+    save = asyncio.create_task(
+        storage.save_thread("T1", "alice", [SVUser(text="hi")], True)
+    )
+    await started.wait()
+    save.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await save
+    assert coll.storage["T1"]["topic"] == ""
+
+    async def fake_topic(content):
+        return "greeting"
+
+    monkeypatch.setattr(mongo_storage, "summarize_topic", fake_topic)
+    await storage.save_thread("T1", "alice", [SVAssistant(text="hello")], True)
+    assert coll.storage["T1"]["topic"] == "greeting"
+
+
+@pytest.mark.asyncio
+async def test_save_threads_bulk(monkeypatch, patch_db, GOOD_HEADERS):
+    async def fake_topic(content):
+        return "summarized"
+
+    monkeypatch.setattr(mongo_storage, "summarize_topic", fake_topic, raising=True)
+
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    coll.storage["T1"] = {"thread_id": "T1", "user_id": "alice", "topic": "kept"}
+
+    await storage.save_threads_bulk(
+        [
+            ("T1", "alice", [SVUser(text="hi"), SVAssistant(text="hello")]),
+            ("T2", "alice", [SVUser(text="new")]),
+            ("T3", "alice", []),
+        ]
+    )
+
+    assert set(coll.storage) == {"T1", "T2"}
+    assert coll.storage["T1"]["topic"] == "kept"
+    assert coll.storage["T2"]["topic"] == "summarized"
+    conv = await storage.read_thread("T1")
+    assert [v["variant"] for v in conv] == ["User", "Assistant"]
+
+
+@pytest.mark.asyncio
+async def test_update_topic_and_delete_report_misses(patch_db, GOOD_HEADERS):
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    coll.storage["T1"] = {"thread_id": "T1", "user_id": "alice", "topic": "old"}
+
+    assert await storage.update_thread_topic("T1", "New Topic") is True
+    assert coll.storage["T1"]["topic_lc"] == "new topic"
+    assert await storage.update_thread_topic("missing", "x") is False
+
+    assert await storage.delete_thread("T1") is True
+    assert await storage.delete_thread("T1") is False
+
+
+@pytest.mark.asyncio
+async def test_recent_threads_cached_until_save(monkeypatch, patch_db, GOOD_HEADERS):
+    async def fake_topic(content):
+        return "topic"
+
+    monkeypatch.setattr(mongo_storage, "summarize_topic", fake_topic, raising=True)
+
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    await storage.save_thread("T1", "alice", [SVUser(text="hi")])
+
+    assert (await storage.list_recent_threads("alice"))[1] == 1
+    # Written behind the storage's back: still served from the cache
+    coll.storage["T2"] = dict(coll.storage["T1"], thread_id="T2")
+    assert (await storage.list_recent_threads("alice"))[1] == 1
+
+    await storage.save_thread("T3", "alice", [SVUser(text="again")])
+    assert (await storage.list_recent_threads("alice"))[1] == 3
+    await storage.delete_thread("T3")
+    assert (await storage.list_recent_threads("alice"))[1] == 2
+
+
+@pytest.mark.asyncio
+async def test_read_thread_cache_follows_date(patch_db, GOOD_HEADERS):
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    first = [{"variant": "User", "content": "hi"}]
+    coll.storage["T1"] = {"thread_id": "T1", "date": 1, "content": first}
+
+    assert await storage.read_thread("T1") == first
+    # Same date: served from the cache even though the stored list changed
+    coll.storage["T1"]["content"] = []
+    assert await storage.read_thread("T1") == first
+    # A save stamps a new date, which invalidates the cached copy
+    coll.storage["T1"]["date"] = 2
+    assert await storage.read_thread("T1") == []
+
+
+@pytest.mark.asyncio
+async def test_read_thread_cache_expires_and_skips_images(
+    monkeypatch, patch_db, GOOD_HEADERS
+):
+    storage = await ThreadStorage.create(vault_url=GOOD_HEADERS["x-freva-vault-url"])
+    coll = patch_db[MONGODB_COLLECTION_NAME]
+    text = [{"variant": "User", "content": "hi"}]
+    image = [{"variant": "Image", "content": "aW1n", "id": "c1_0"}]
+    coll.storage["T1"] = {"thread_id": "T1", "date": 1, "content": text}
+    coll.storage["T2"] = {"thread_id": "T2", "date": 1, "content": image}
+
+    await storage.read_thread("T1")
+    await storage.read_thread("T2")
+    assert list(mongo_storage._THREAD_CACHE) == [(storage.vault_url, "T1")]
+
+    # Past the TTL the entry is dropped and the stored content is read again.
+    coll.storage["T1"]["content"] = []
+    monkeypatch.setattr(mongo_storage, "_THREAD_TTL_S", 0.0)
+    assert await storage.read_thread("T1") == []
+
+
+@pytest.mark.asyncio
+async def test_summarize_topic_skips_llm_for_short_text(monkeypatch):
+    import src.services.storage.helpers as storage_helpers
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("LLM must not be called")
+
+    monkeypatch.setattr(storage_helpers, "acomplete", fail, raising=True)
+
+    topic = await storage_helpers.summarize_topic([SVUser(text="  Plot  the sst ")])
+    assert topic == "Plot the sst"
+    assert await storage_helpers.summarize_topic([]) == "Untitled"
+
+
+@pytest.mark.asyncio
+async def test_slow_vault_does_not_block_other_vaults(monkeypatch):
+    import asyncio
+    import src.services.storage.helpers as storage_helpers
+
+    release = asyncio.Event()
+    fetched = []
+
+    async def fetch(vault_url):
+        fetched.append(vault_url)
+        if vault_url == "http://slow":
+            await release.wait()
+        return f"mongodb://{vault_url[7:]}"
+
+    monkeypatch.setattr(storage_helpers, "_fetch_mongodb_uri", fetch)
+    monkeypatch.setattr(storage_helpers, "_URI_CACHE", {})
+    monkeypatch.setattr(storage_helpers, "_URI_LOCKS", {})
+
+    slow = [
+        asyncio.create_task(storage_helpers.get_mongodb_uri("http://slow"))
+        for _ in range(2)
+    ]
+    uri = await asyncio.wait_for(storage_helpers.get_mongodb_uri("http://fast"), 1)
+    assert uri == "mongodb://fast"
+
+    release.set()
+    assert await asyncio.gather(*slow) == ["mongodb://slow"] * 2
+    assert fetched == ["http://slow", "http://fast"]
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+import pytest
+
+from src.services.streaming import tool_calls as T
+
+
+class FakeMcp:
+    def __init__(self, mongodb_uri="mongodb://alice"):
+        self.calls = []
+        self.mongodb_uri = mongodb_uri
+
+    def get_server_from_tool(self, tool_name):
+        return "rag" if tool_name == "get_context_from_resources" else "code"
+
+    def headers_identity(self, target):
+        return self.mongodb_uri
+
+    def call_tool(self, server, *, name, arguments):
+        self.calls.append((name, arguments))
+        return {"structuredContent": {"result": f"{name}:{len(self.calls)}"}}
+
+
+@pytest.mark.asyncio
+async def test_only_allowlisted_tool_results_are_cached(monkeypatch):
+    monkeypatch.setattr(T, "_TOOL_CACHE", OrderedDict())
+    mcp = FakeMcp()
+
+    # Same arguments in a different key order hit the same entry.
+    first = await T.run_tool_via_mcp(
+        mcp=mcp,
+        tool_name="get_context_from_resources",
+        arguments_json='{"question": "q", "resources_to_retrieve_from": "xarray"}',
+    )
+    second = await T.run_tool_via_mcp(
+        mcp=mcp,
+        tool_name="get_context_from_resources",
+        arguments_json='{"resources_to_retrieve_from": "xarray", "question": "q"}',
+    )
+    assert first == second
+    assert len(mcp.calls) == 1
+
+    # code_interpreter has side effects and always runs.
+    for _ in range(2):
+        await T.run_tool_via_mcp(
+            mcp=mcp, tool_name="code_interpreter", arguments_json='{"code": "1"}'
+        )
+    assert len(mcp.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_cached_tool_results_are_not_shared_between_users(monkeypatch):
+    monkeypatch.setattr(T, "_TOOL_CACHE", OrderedDict())
+    alice, bob = FakeMcp("mongodb://alice"), FakeMcp("mongodb://bob")
+    args = '{"question": "q", "resources_to_retrieve_from": "xarray"}'
+
+    for mcp in (alice, bob, alice):
+        await T.run_tool_via_mcp(
+            mcp=mcp, tool_name="get_context_from_resources", arguments_json=args
+        )
+
+    assert len(alice.calls) == 1
+    assert len(bob.calls) == 1
+
+
+def _parse(result):
+    *variants, summary = T.parse_code_interpreter_result(result, id="c1")
+    return variants, summary
+
+
+def test_code_interpreter_result_with_stdout_only():
+    variants, summary = _parse({"stdout": "42", "result_repr": "", "stderr": ""})
+
+    assert [(v.variant, v.output) for v in variants] == [("CodeOutput", "\n42")]
+    assert summary.var_block == variants
+    assert summary.is_error is False
+
+
+def test_code_interpreter_result_with_error_output():
+    variants, summary = _parse(
+        {"stdout": "partial", "stderr": "warning", "error": "ZeroDivisionError"}
+    )
+
+    assert variants[0].output == "\npartial\nwarning\nZeroDivisionError"
+    assert summary.is_error is True
+    _, summary = _parse({"error": "NameError"})
+    assert summary.is_error is True
+
+
+def test_code_interpreter_result_with_display_data():
+    variants, summary = _parse(
+        {
+            "stdout": "",
+            "display_data": [{"image/png": "aW1n"}, {"application/json": '{"a": 1}'}],
+        }
+    )
+
+    assert [v.variant for v in variants] == ["CodeOutput", "Image", "CodeOutput"]
+    assert variants[0].output == ""
+    assert (variants[1].b64, variants[1].id) == ("aW1n", "c1_0")
+    assert (variants[2].output, variants[2].id) == ('{"a": 1}', "c1:json")
+    assert summary.var_block == variants
+    assert summary.is_error is False